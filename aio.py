@@ -0,0 +1,89 @@
+import asyncio
+
+from flask import abort, current_app, g, render_template
+from sqlalchemy.pool import NullPool
+
+import models
+
+#----------------------------------------------------------------------------#
+# Async mode.
+#----------------------------------------------------------------------------#
+
+# Flask runs each async view on its own event loop, so connections are not
+# pooled across requests here and the DB_POOL_* settings do not apply; put
+# pgbouncer in front when ASYNC_MODE is on. Replica routing and
+# DB_STATEMENT_TIMEOUT are the same as for the sync session.
+
+
+def async_database_uri(uri):
+    #postgresql://... -> postgresql+asyncpg://...
+    scheme, rest = uri.split('://', 1)
+    return f"{scheme.split('+')[0]}+asyncpg://{rest}"
+
+
+def engine_options(config):
+    options = {'poolclass': NullPool}
+    if config['DB_STATEMENT_TIMEOUT']:
+        options['connect_args'] = {'server_settings': {'statement_timeout': str(config['DB_STATEMENT_TIMEOUT'])}}
+    return options
+
+
+def get_engine():
+    #Engine for the database the sync session would use: the replica picked for the request, or the primary
+    bind_key = g.get('db_replica')
+    uri = current_app.config['SQLALCHEMY_BINDS'][bind_key] if bind_key else current_app.config['SQLALCHEMY_DATABASE_URI']
+    engines = current_app.extensions.setdefault('async_engines', {})
+    if uri not in engines:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        engines[uri] = create_async_engine(async_database_uri(uri), **engine_options(current_app.config))
+    return engines[uri]
+
+
+async def fetch(query):
+    #Each query gets its own connection so gathered queries really run concurrently
+    async with get_engine().connect() as conn:
+        result = await conn.execute(query.statement)
+        return result.all()
+
+
+async def venue_details(venue_id):
+    venue_rows, shows_data = await asyncio.gather(
+        fetch(models.Venue.query.filter(models.Venue.id == venue_id)),
+        fetch(models.venue_shows(venue_id))
+    )
+    if not venue_rows:
+        return None
+    return models.venue_page(venue_rows[0], shows_data)
+
+
+async def artist_details(artist_id):
+    artist_rows, shows_data = await asyncio.gather(
+        fetch(models.Artist.query.filter(models.Artist.id == artist_id)),
+        fetch(models.artist_shows(artist_id))
+    )
+    if not artist_rows:
+        return None
+    return models.artist_page(artist_rows[0], shows_data)
+
+
+def init_app(app, page_cache):
+    #Swap the detail views for async ones, URLs and templates stay the same
+    if not app.config['ASYNC_MODE']:
+        return
+
+    @page_cache.cached
+    async def show_venue(venue_id):
+        data = await venue_details(venue_id)
+        if data is None:
+            abort(404)
+        return render_template('pages/show_venue.html', venue=data)
+
+    @page_cache.cached
+    async def show_artist(artist_id):
+        data = await artist_details(artist_id)
+        if data is None:
+            abort(404)
+        return render_template('pages/show_artist.html', artist=data)
+
+    app.view_functions['venues.show_venue'] = show_venue
+    app.view_functions['artists.show_artist'] = show_artist
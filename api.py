@@ -0,0 +1,116 @@
+import hashlib
+import json
+from datetime import datetime
+
+from flask import Blueprint, abort, request, Response
+
+import models
+
+#----------------------------------------------------------------------------#
+# JSON API.
+#----------------------------------------------------------------------------#
+
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+
+
+def json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def make_etag(*parts):
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def not_modified(etag):
+    #weak comparison, compressed responses carry the ETag weakened
+    return request.if_none_match.contains_weak(etag)
+
+
+def conditional_json(etag, build):
+    #build() is only called, and its result serialized, when the client copy is stale.
+    #No Last-Modified: deleted shows and shows moving to the past change the
+    #payload without touching any updated_at, only the ETag covers them
+    if not_modified(etag):
+        response = Response(status=304)
+    else:
+        response = Response(json.dumps(build(), default=json_default), mimetype='application/json')
+
+    response.set_etag(etag)
+    return response
+
+
+def listing(kind, data, next_cursor):
+    return conditional_json(make_etag(kind, data, next_cursor), lambda: {'data': data, 'next': next_cursor})
+
+
+def detail(kind, object_id, version, build):
+    if version is None:
+        abort(404)
+    return conditional_json(make_etag(kind, object_id, tuple(version)), lambda: build(object_id))
+
+
+#  Endpoints
+#  ----------------------------------------------------------------
+
+@api.route('/venues')
+def venues():
+    return listing('venues', *models.venue_areas(request.args.get('after'), request.args.get('genre')))
+
+
+@api.route('/venues/<int:venue_id>')
+def venue(venue_id):
+    return detail('venue', venue_id, models.venue_version(venue_id), models.venue_details)
+
+
+@api.route('/artists')
+def artists():
+    return listing('artists', *models.artist_list(request.args.get('after'), request.args.get('genre')))
+
+
+@api.route('/artists/<int:artist_id>')
+def artist(artist_id):
+    return detail('artist', artist_id, models.artist_version(artist_id), models.artist_details)
+
+
+@api.route('/shows')
+def shows():
+    return listing('shows', *models.show_list(request.args.get('after')))
+
+
+def availability_args():
+    #city, state and an ISO start/end period from the query string, 400 when missing or malformed
+    try:
+        city = request.args['city']
+        state = request.args['state']
+        start_time = datetime.fromisoformat(request.args['start'])
+        end_time = datetime.fromisoformat(request.args['end'])
+    except (KeyError, ValueError):
+        abort(400)
+    if end_time <= start_time:
+        abort(400)
+    return city, state, start_time, end_time
+
+
+@api.route('/venues/available')
+def available_venues():
+    #?city=Austin&state=TX&start=2026-10-23T20:00&end=2026-10-23T23:00
+    city, state, start_time, end_time = availability_args()
+    rows = models.available_venues(city, state, start_time, end_time)
+    return conditional_json(make_etag('available_venues', city, state, start_time, end_time, rows), lambda: {'data': [row._asdict() for row in rows]})
+
+
+@api.route('/artists/available')
+def available_artists():
+    #?city=Austin&state=TX&start=2026-10-23T20:00&end=2026-10-23T23:00
+    city, state, start_time, end_time = availability_args()
+    rows = models.available_artists(city, state, start_time, end_time)
+    return conditional_json(make_etag('available_artists', city, state, start_time, end_time, rows), lambda: {'data': [row._asdict() for row in rows]})
+
+
+@api.route('/genres/<any(artists, venues):kind>')
+def genres(kind):
+    #?city=Austin&state=TX narrows the counts to one area
+    rows = models.genre_facets(kind, request.args.get('city'), request.args.get('state'))
+    return conditional_json(make_etag('genres', kind, request.args.get('city'), request.args.get('state'), rows), lambda: {'data': [row._asdict() for row in rows]})
@@ -0,0 +1,154 @@
+import sys
+
+from flask import Blueprint, render_template, request, flash, redirect, url_for, abort
+
+from extensions import db, page_cache, job_queue
+from models import Artist, artist_list, artist_details, artists_with_upcoming_counts, search_results, genre_facets
+
+#----------------------------------------------------------------------------#
+# Artists.
+#----------------------------------------------------------------------------#
+
+bp = Blueprint('artists', __name__)
+
+
+@bp.route('/artists')
+@page_cache.cached
+def artists():
+    genre = request.args.get('genre')
+    data, next_cursor = artist_list(request.args.get('after'), genre)
+    return render_template('pages/artists.html', artists=data, next_cursor=next_cursor, genre=genre, genres=genre_facets('artists'))
+
+
+@bp.route('/artists/search', methods=['POST'])
+def search_artists():
+    search_input = request.form.get('search_term', '')
+    search_output = search_results(artists_with_upcoming_counts(), Artist, search_input)
+
+    return render_template('pages/search_artists.html', results=search_output, search_term=search_input)
+
+
+@bp.route('/artists/<int:artist_id>')
+@page_cache.cached
+def show_artist(artist_id):
+    data = artist_details(artist_id)
+    if data is None:
+        abort(404)
+
+    return render_template('pages/show_artist.html', artist=data)
+
+#  Update
+#  ----------------------------------------------------------------
+
+
+@bp.route('/artists/<int:artist_id>/edit', methods=['GET'])
+def edit_artist(artist_id):
+    from forms import ArtistForm
+    form = ArtistForm()
+    artist = Artist.query.get(artist_id)
+
+    if artist:
+        form.name.data = artist.name
+        form.city.data = artist.city
+        form.state.data = artist.state
+        form.phone.data = artist.phone
+        form.genres.data = artist.genres
+        form.facebook_link.data = artist.facebook_link
+        form.image_link.data = artist.image_link
+        form.website_link.data = artist.website_link
+        form.seeking_venue.data = artist.seeking_venue
+        form.seeking_description.data = artist.seeking_description
+
+    return render_template('forms/edit_artist.html', form=form, artist=artist)
+
+
+@bp.route('/artists/<int:artist_id>/edit', methods=['POST'])
+def edit_artist_submission(artist_id):
+    #edit artists form data in db table
+
+    error = False
+    artist = Artist.query.get(artist_id)
+
+    try:
+        artist.name = request.form['name']
+        artist.city = request.form['city']
+        artist.state = request.form['state']
+        artist.phone = request.form['phone']
+        artist.genres = request.form.getlist('genres')
+        artist.facebook_link = request.form['facebook_link']
+        artist.image_link = request.form['image_link']
+        artist.website_link = request.form['website_link']
+        artist.seeking_venue = True
+        artist.seeking_description = request.form['seeking_description']
+
+        db.session.commit()
+
+    except:
+        db.session.rollback()
+        error = True
+        print(sys.exc_info())
+
+    finally:
+        db.session.close()
+
+    if error:
+        flash('An error occurred. Artist could not be changed.')
+    else:
+        #the upcoming shows feed carries a copy of the artist's name, image and genres
+        job_queue.enqueue('refresh_upcoming_shows', artist_ids=[artist_id])
+        if request.form['image_link']:
+            job_queue.enqueue('prefetch_image', link=request.form['image_link'])
+        flash('Artist was successfully updated!')
+
+    return redirect(url_for('artists.show_artist', artist_id=artist_id))
+
+#  Create Artist
+#  ----------------------------------------------------------------
+
+
+@bp.route('/artists/create', methods=['GET'])
+def create_artist_form():
+    from forms import ArtistForm
+    form = ArtistForm()
+    return render_template('forms/new_artist.html', form=form)
+
+
+@bp.route('/artists/create', methods=['POST'])
+def create_artist_submission():
+    # Add artists data in the db table
+
+    error = False
+    try:
+        data = request.form
+
+        artist = Artist(
+            name=data['name'],
+            city=data['city'],
+            state=data['state'],
+            phone=data['phone'],
+            genres=data.getlist('genres'),
+            facebook_link=data['facebook_link'],
+            image_link=data['image_link'],
+            website_link=data['website_link'],
+            seeking_description=data['seeking_description']
+        )
+
+        db.session.add(artist)
+        db.session.commit()
+
+    except:
+        error = True
+        db.session.rollback()
+        print(sys.exc_info())
+
+    finally:
+        db.session.close()
+
+    if error == True:
+        flash(f"An error occurred. Artist {data['name']} could not be listed.")
+    else:
+        if data['image_link']:
+            job_queue.enqueue('prefetch_image', link=data['image_link'])
+        flash(f"Artist {data['name']} was successfully listed!")
+
+    return render_template('pages/home.html')
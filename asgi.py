@@ -0,0 +1,6 @@
+from asgiref.wsgi import WsgiToAsgi
+
+from wsgi import app
+
+# ASGI entry point: uvicorn asgi:application
+application = WsgiToAsgi(app)
@@ -0,0 +1,235 @@
+import gzip
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import posixpath
+import re
+
+import click
+from flask import abort, current_app, request, send_from_directory, url_for
+
+#----------------------------------------------------------------------------#
+# Static assets.
+#----------------------------------------------------------------------------#
+
+# bundle name -> source files under static/, in load order
+BUNDLES = {
+    'app.css': [
+        'css/bootstrap.min.css',
+        'css/layout.main.css',
+        'css/main.css',
+        'css/main.responsive.css',
+        'css/main.quickfix.css',
+    ],
+    'head.js': [
+        'js/libs/modernizr-2.8.2.min.js',
+        'js/libs/moment.min.js',
+    ],
+    'app.js': [
+        'js/libs/jquery-1.11.1.min.js',
+        'js/libs/bootstrap-3.1.1.min.js',
+        'js/plugins.js',
+        'js/script.js',
+    ],
+}
+
+# image -> widths of the responsive WebP variants
+IMAGES = {
+    'img/front-splash.jpg': [480, 960, 1440],
+}
+
+# fingerprinted files never change, so they can be cached for a year
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json')
+
+CSS_URL = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+
+def dist_dir(app):
+    return os.path.join(app.static_folder, 'dist')
+
+
+def fingerprint(name, content):
+    root, ext = os.path.splitext(name)
+    return f'{root}.{hashlib.sha256(content).hexdigest()[:12]}{ext}'
+
+
+def minify_css(text):
+    try:
+        import rcssmin
+        return rcssmin.cssmin(text)
+    except ImportError:
+        text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+        text = re.sub(r'\s+', ' ', text)
+        text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+        text = re.sub(r':\s+', ':', text)
+        return text.replace(';}', '}').strip()
+
+
+def rebase_urls(text, source, static_url_path):
+    #Point relative url()s at the file under static/, the bundle is served from /assets/ instead of next to its source
+    base = posixpath.dirname(source)
+
+    def rebase(match):
+        quote, url = match.groups()
+        if url.startswith(('/', '#', 'data:')) or '://' in url:
+            return match.group(0)
+        return f'url({quote}{static_url_path}/{posixpath.normpath(posixpath.join(base, url))}{quote})'
+
+    return CSS_URL.sub(rebase, text)
+
+
+def minify_js(text):
+    #vendored libs are already minified; without rjsmin the rest is only concatenated
+    try:
+        import rjsmin
+        return rjsmin.jsmin(text)
+    except ImportError:
+        return text
+
+
+def write_compressed(path, content):
+    #.gz always, .br when the brotli package is installed
+    with gzip.open(path + '.gz', 'wb', compresslevel=9) as f:
+        f.write(content)
+    try:
+        import brotli
+    except ImportError:
+        return
+    with open(path + '.br', 'wb') as f:
+        f.write(brotli.compress(content, quality=11))
+
+
+def write_asset(out_dir, name, content, manifest):
+    filename = fingerprint(name, content)
+    path = os.path.join(out_dir, filename)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    if filename.endswith(COMPRESSIBLE):
+        write_compressed(path, content)
+    manifest[name] = filename
+
+
+def build_bundles(app, out_dir, manifest):
+    for name, sources in BUNDLES.items():
+        parts = []
+        for source in sources:
+            with open(os.path.join(app.static_folder, source), encoding='utf-8') as f:
+                text = f.read()
+            if name.endswith('.css'):
+                text = rebase_urls(text, source, app.static_url_path)
+            parts.append(text)
+
+        if name.endswith('.css'):
+            content = minify_css('\n'.join(parts))
+        else:
+            content = ';\n'.join(minify_js(part) for part in parts)
+        write_asset(out_dir, name, content.encode('utf-8'), manifest)
+
+
+def build_images(app, out_dir, manifest):
+    try:
+        from PIL import Image
+    except ImportError:
+        click.echo('Pillow is not installed, skipping responsive images.')
+        return
+
+    for source, widths in IMAGES.items():
+        root, _ = os.path.splitext(source)
+        with Image.open(os.path.join(app.static_folder, source)) as image:
+            image = image.convert('RGB')
+            for width in widths:
+                if width > image.width:
+                    continue
+                resized = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+                buffer = io.BytesIO()
+                resized.save(buffer, 'WEBP', quality=80, method=6)
+                write_asset(out_dir, f'{root}-{width}.webp', buffer.getvalue(), manifest)
+
+
+def build(app):
+    out_dir = dist_dir(app)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {}
+
+    build_bundles(app, out_dir, manifest)
+    build_images(app, out_dir, manifest)
+
+    with open(os.path.join(out_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(app):
+    try:
+        with open(os.path.join(dist_dir(app), 'manifest.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class Assets(object):
+
+    def __init__(self, app=None):
+        self.manifest = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.manifest = load_manifest(app)
+        app.add_url_rule('/assets/<path:filename>', 'assets', self.serve)
+        app.jinja_env.globals['asset_urls'] = self.asset_urls
+        app.jinja_env.globals['image_srcset'] = self.image_srcset
+        app.extensions['assets'] = self
+
+        @app.cli.group('assets')
+        def assets_group():
+            """Build fingerprinted static bundles."""
+
+        @assets_group.command('build')
+        def build_command():
+            """Bundle, minify, fingerprint and precompress static assets."""
+            self.manifest = build(app)
+            for name, filename in sorted(self.manifest.items()):
+                click.echo(f'{name} -> dist/{filename}')
+
+    def asset_urls(self, name):
+        #Fingerprinted bundle when built, otherwise the source files one by one
+        if name in self.manifest:
+            return [url_for('assets', filename=self.manifest[name])]
+        return [url_for('static', filename=source) for source in BUNDLES.get(name, [name])]
+
+    def image_srcset(self, source):
+        #srcset of the built WebP variants, empty before the first build
+        root, _ = os.path.splitext(source)
+        return ', '.join(
+            f"{url_for('assets', filename=self.manifest[f'{root}-{width}.webp'])} {width}w"
+            for width in IMAGES.get(source, []) if f'{root}-{width}.webp' in self.manifest
+        )
+
+    def serve(self, filename):
+        #Send the .br/.gz sibling when the client accepts it
+        directory = dist_dir(current_app)
+        if '..' in filename.split('/') or not os.path.isfile(os.path.join(directory, filename)):
+            abort(404)
+
+        encoding = None
+        for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if candidate in request.accept_encodings and os.path.isfile(os.path.join(directory, filename + suffix)):
+                encoding = candidate
+                break
+
+        if encoding:
+            mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            response = send_from_directory(directory, filename + ('.br' if encoding == 'br' else '.gz'), mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+        else:
+            response = send_from_directory(directory, filename)
+
+        response.headers['Cache-Control'] = IMMUTABLE
+        response.vary.add('Accept-Encoding')
+        return response
@@ -0,0 +1,51 @@
+import json
+import platform
+import subprocess
+import time
+
+#----------------------------------------------------------------------------#
+# Shared benchmark helpers.
+#----------------------------------------------------------------------------#
+
+
+def percentile(samples, fraction):
+    #Nearest-rank percentile of an unsorted list of timings
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    #Timings in seconds -> milliseconds summary
+    if not samples:
+        return {'count': 0}
+    return {
+        'count': len(samples),
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 3),
+        'p50_ms': round(percentile(samples, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(samples, 0.99) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path, kind, results, **extra):
+    #One JSON document per run, keyed by commit so runs can be compared over time
+    document = {
+        'kind': kind,
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        **extra,
+        'routes': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+    return document
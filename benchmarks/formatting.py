@@ -0,0 +1,79 @@
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+import babel.dates
+import dateutil.parser
+
+from benchmarks.common import summarize, write_results
+
+#----------------------------------------------------------------------------#
+# Date formatting benchmark.
+#----------------------------------------------------------------------------#
+
+
+def format_datetime_uncached(value, format='medium'):
+    #The filter as it was before formatting.py, kept as the baseline
+    if isinstance(value, str):
+        date = dateutil.parser.parse(value)
+    else:
+        date = value
+    if format == 'full':
+        format = "EEEE MMMM, d, y 'at' h:mma"
+    elif format == 'medium':
+        format = "EE MM, dd, y h:mma"
+    return babel.dates.format_datetime(date, format, locale='en')
+
+
+def make_timestamps(count, seed):
+    #Show start times spread over two years, on the hour like real bookings
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    return [start + timedelta(hours=rng.randrange(2 * 365 * 24)) for _ in range(count)]
+
+
+def time_pass(formatter, values):
+    started = time.perf_counter()
+    for value in values:
+        formatter(value, 'full')
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the datetime filter over a page worth of show timestamps.')
+    parser.add_argument('--count', type=int, default=10000)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default='bench_formatting.json')
+    args = parser.parse_args()
+
+    from formatting import format_cached, to_datetime
+
+    def format_fast(value, format):
+        return format_cached(to_datetime(value), format, 'en', 'UTC')
+
+    def cold(values):
+        #memoized patterns and locales only, no formatted strings from earlier rounds
+        format_cached.cache_clear()
+        return time_pass(format_fast, values)
+
+    timestamps = make_timestamps(args.count, args.seed)
+    inputs = {
+        'datetime': timestamps,
+        'string': [str(value) for value in timestamps],
+    }
+
+    results = {}
+    for input_kind, values in inputs.items():
+        results[f'uncached_{input_kind}'] = summarize([time_pass(format_datetime_uncached, values) for _ in range(args.rounds)])
+        results[f'cold_{input_kind}'] = summarize([cold(values) for _ in range(args.rounds)])
+        results[f'warm_{input_kind}'] = summarize([time_pass(format_fast, values) for _ in range(args.rounds)])
+
+    write_results(args.output, 'formatting', results, count=args.count, rounds=args.rounds)
+    for name, summary in results.items():
+        print(f"{name:18} p50 {summary['p50_ms']:9.2f}ms per {args.count} timestamps")
+
+
+if __name__ == '__main__':
+    main()
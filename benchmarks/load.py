@@ -0,0 +1,95 @@
+import argparse
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+from benchmarks.common import summarize, write_results
+
+#----------------------------------------------------------------------------#
+# Load test.
+#----------------------------------------------------------------------------#
+
+# (name, weight, method, path, form data): roughly the browsing mix of real users
+TASKS = [
+    ('venues', 10, 'GET', '/venues', None),
+    ('artists', 10, 'GET', '/artists', None),
+    ('shows', 15, 'GET', '/shows', None),
+    ('show_venue', 25, 'GET', '/venues/{venue_id}', None),
+    ('show_artist', 25, 'GET', '/artists/{artist_id}', None),
+    ('search_venues', 5, 'POST', '/venues/search', {'search_term': 'blue'}),
+    ('search_artists', 5, 'POST', '/artists/search', {'search_term': 'midnight'}),
+    ('api_shows', 5, 'GET', '/api/v1/shows', None),
+]
+
+
+class User(threading.Thread):
+    #Picks weighted tasks back to back until the deadline, like a locust user with no wait
+
+    def __init__(self, host, deadline, max_id, samples, errors, lock, seed):
+        super(User, self).__init__(daemon=True)
+        self.host = host
+        self.deadline = deadline
+        self.max_id = max_id
+        self.samples = samples
+        self.errors = errors
+        self.lock = lock
+        self.rng = random.Random(seed)
+
+    def run(self):
+        weights = [task[1] for task in TASKS]
+        while time.monotonic() < self.deadline:
+            name, _, method, path, data = self.rng.choices(TASKS, weights=weights)[0]
+            path = path.format(venue_id=self.rng.randint(1, self.max_id), artist_id=self.rng.randint(1, self.max_id))
+            body = urllib.parse.urlencode(data).encode() if data else None
+            request = urllib.request.Request(self.host + path, data=body, method=method)
+
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    response.read()
+                failed = False
+            except urllib.error.HTTPError as error:
+                failed = error.code >= 500
+            except OSError:
+                failed = True
+            elapsed = time.perf_counter() - started
+
+            with self.lock:
+                self.samples[name].append(elapsed)
+                if failed:
+                    self.errors[name] += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Drive a running server with concurrent simulated users.')
+    parser.add_argument('--host', default='http://127.0.0.1:5000')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--duration', type=int, default=30, help='Seconds.')
+    parser.add_argument('--max-id', type=int, default=1000, help='Highest venue/artist id to request.')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='load_output.json')
+    args = parser.parse_args()
+
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    users = [User(args.host.rstrip('/'), deadline, args.max_id, samples, errors, lock, args.seed + n) for n in range(args.users)]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+
+    results = {name: dict(summarize(timings), errors=errors[name], rps=round(len(timings) / args.duration, 2)) for name, timings in samples.items()}
+    write_results(args.output, 'load', results, users=args.users, duration=args.duration, host=args.host)
+    for name, summary in sorted(results.items()):
+        print(f"{name:16} {summary['rps']:8.1f} rps  p50 {summary['p50_ms']:9.2f}ms  p99 {summary['p99_ms']:9.2f}ms  errors {summary['errors']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.common import summarize, write_results
+
+#----------------------------------------------------------------------------#
+# Startup benchmark.
+#----------------------------------------------------------------------------#
+
+# (name, statement building the app) each run in a fresh interpreter
+TARGETS = [
+    ('worker', 'from wsgi import app'),
+    ('cli', 'from app import create_app; create_app()'),
+]
+
+# Runs in the child, reports its own import time, peak RSS and module count
+PROBE = '''
+import json, resource, sys, time
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    'seconds': elapsed,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'modules': len(sys.modules),
+}}))
+'''
+
+
+def probe(statement):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.check_output([sys.executable, '-c', PROBE.format(statement=statement)], cwd=root)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time cold app startup in fresh interpreters.')
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--output', default='bench_startup.json')
+    args = parser.parse_args()
+
+    results = {}
+    for name, statement in TARGETS:
+        runs = [probe(statement) for _ in range(args.rounds)]
+        results[name] = dict(
+            summarize([run['seconds'] for run in runs]),
+            max_rss_kb=max(run['max_rss_kb'] for run in runs),
+            modules=runs[-1]['modules'],
+        )
+
+    write_results(args.output, 'startup', results, rounds=args.rounds)
+    for name, summary in results.items():
+        print(f"{name:8} p50 {summary['p50_ms']:9.2f}ms  rss {summary['max_rss_kb'] / 1024:7.1f}MB  {summary['modules']} modules")
+
+
+if __name__ == '__main__':
+    main()
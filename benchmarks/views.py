@@ -0,0 +1,63 @@
+import argparse
+import time
+
+from benchmarks.common import summarize, write_results
+
+#----------------------------------------------------------------------------#
+# View microbenchmarks.
+#----------------------------------------------------------------------------#
+
+# (name, method, path, form data); run against a database filled by `flask seed`
+ROUTES = [
+    ('index', 'GET', '/', None),
+    ('venues', 'GET', '/venues', None),
+    ('artists', 'GET', '/artists', None),
+    ('shows', 'GET', '/shows', None),
+    ('show_venue', 'GET', '/venues/1', None),
+    ('show_artist', 'GET', '/artists/1', None),
+    ('search_venues', 'POST', '/venues/search', {'search_term': 'blue'}),
+    ('search_artists', 'POST', '/artists/search', {'search_term': 'midnight'}),
+    ('api_venues', 'GET', '/api/v1/venues', None),
+    ('api_venue', 'GET', '/api/v1/venues/1', None),
+    ('api_shows', 'GET', '/api/v1/shows', None),
+]
+
+
+def run(client, rounds, warmup):
+    results = {}
+    for name, method, path, data in ROUTES:
+        for _ in range(warmup):
+            client.open(path, method=method, data=data)
+
+        samples = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            response = client.open(path, method=method, data=data)
+            samples.append(time.perf_counter() - started)
+
+        results[name] = dict(summarize(samples), status=response.status_code)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time every view in-process with the Flask test client.')
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--cache', action='store_true', help='Leave the page cache on.')
+    parser.add_argument('--output', default='bench_output.json')
+    args = parser.parse_args()
+
+    from app import create_app
+    app = create_app()
+    app.config['CACHE_ENABLED'] = args.cache
+
+    with app.test_client() as client:
+        results = run(client, args.rounds, args.warmup)
+
+    write_results(args.output, 'views', results, rounds=args.rounds, cache=args.cache)
+    for name, summary in results.items():
+        print(f"{name:16} p50 {summary['p50_ms']:9.2f}ms  p99 {summary['p99_ms']:9.2f}ms  [{summary['status']}]")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, g, has_app_context, request, session, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+#----------------------------------------------------------------------------#
+# Page cache.
+#----------------------------------------------------------------------------#
+
+
+class LRUCache(object):
+    #In-process backend bounded by entry count, entries expire after ttl seconds;
+    #a commit clears only this process's copy, other workers serve stale pages until ttl
+    shared = False
+
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class RedisCache(object):
+    #Backend for anything speaking the Redis protocol, shared between workers
+    shared = True
+
+    def __init__(self, url, ttl=300, prefix='fyyur:page:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*', count=500))
+        if keys:
+            self.client.delete(*keys)
+
+
+def make_backend(config):
+    if config['CACHE_BACKEND'] == 'redis':
+        return RedisCache(config['CACHE_REDIS_URL'], ttl=config['CACHE_TTL'])
+    return LRUCache(max_entries=config['CACHE_MAX_ENTRIES'], ttl=config['CACHE_TTL'])
+
+
+class PageCache(object):
+    #Caches rendered GET pages, cleared whenever a commit touches a watched table
+
+    def __init__(self, app=None, tables=()):
+        self.tables = set(tables)
+        self.backend = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.backend = make_backend(app.config)
+        event.listen(Session, 'after_flush', self._after_flush)
+        event.listen(Session, 'after_bulk_update', self._after_bulk)
+        event.listen(Session, 'after_bulk_delete', self._after_bulk)
+        event.listen(Session, 'after_commit', self._after_commit)
+        event.listen(Session, 'after_rollback', self._after_rollback)
+        app.extensions['page_cache'] = self
+        if 'profiler' in app.extensions:
+            app.extensions['profiler'].register_collector(self.collect)
+
+    def cached(self, view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            #pages carrying flashed messages are per-user, never serve or store them;
+            #visitors pinned to the primary after a write skip pages cached from a replica
+            if not current_app.config['CACHE_ENABLED'] or request.method != 'GET' or '_flashes' in session or g.get('db_primary_pinned'):
+                return current_app.ensure_sync(view)(*args, **kwargs)
+
+            key = self.make_key()
+            body = self.backend.get(key)
+            if body is not None:
+                self._count('hits')
+                response = Response(body, mimetype='text/html')
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            self._count('misses')
+            response = current_app.make_response(current_app.ensure_sync(view)(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                self.backend.set(key, response.get_data())
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+
+    def make_key(self):
+        query = '&'.join(f'{name}={value}' for name, value in sorted(request.args.items(multi=True)))
+        #dates are rendered in the visitor's locale and timezone
+        display = f"{request.cookies.get('locale', '')}|{request.cookies.get('tz', '')}"
+        return f'{request.endpoint}:{request.path}?{query}#{display}'
+
+    def clear(self):
+        self._count('invalidations')
+        self.backend.clear()
+
+    def _count(self, counter):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    #  Invalidation
+    #  ----------------------------------------------------------------
+
+    def _after_flush(self, session, flush_context):
+        for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+            if getattr(instance, '__tablename__', None) in self.tables:
+                session.info['page_cache_dirty'] = True
+                return
+
+    def _after_bulk(self, update_context):
+        if update_context.mapper.local_table.name in self.tables:
+            update_context.session.info['page_cache_dirty'] = True
+
+    def _after_commit(self, session):
+        if session.info.pop('page_cache_dirty', False):
+            self.invalidate()
+
+    def invalidate(self):
+        #clearing a shared backend scans its keys, leave that to a background job;
+        #the writer reads past the cache meanwhile (see replicas.py)
+        jobs = current_app.extensions.get('job_queue') if has_app_context() else None
+        if self.backend.shared and jobs is not None and not jobs.eager:
+            jobs.enqueue('clear_page_cache')
+        else:
+            self.clear()
+
+        #other visitors still read from replicas that may not have the write yet,
+        #and would cache those stale pages again; clear once more when they should have it
+        lag = self.replica_lag() if has_app_context() else 0
+        if lag and jobs is not None and not jobs.eager:
+            jobs.enqueue_in(lag, 'clear_page_cache')
+
+    def replica_lag(self):
+        router = current_app.extensions.get('replica_router')
+        if router is None or not router.binds:
+            return 0
+        return router.sticky_seconds
+
+    def _after_rollback(self, session):
+        session.info.pop('page_cache_dirty', None)
+
+    #  Metrics
+    #  ----------------------------------------------------------------
+
+    def collect(self):
+        return [
+            '# HELP fyyur_page_cache_hits_total Page cache hits.',
+            '# TYPE fyyur_page_cache_hits_total counter',
+            f'fyyur_page_cache_hits_total {self.hits}',
+            '# HELP fyyur_page_cache_misses_total Page cache misses.',
+            '# TYPE fyyur_page_cache_misses_total counter',
+            f'fyyur_page_cache_misses_total {self.misses}',
+            '# HELP fyyur_page_cache_invalidations_total Page cache clears after model commits.',
+            '# TYPE fyyur_page_cache_invalidations_total counter',
+            f'fyyur_page_cache_invalidations_total {self.invalidations}',
+        ]
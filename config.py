@@ -1,14 +1,158 @@
 import os
-SECRET_KEY = os.urandom(32)
 # Grabs the folder where the script runs.
 basedir = os.path.abspath(os.path.dirname(__file__))
 
-# Enable debug mode.
-DEBUG = True
 
-# Connect to the database
+class Config(object):
+    SECRET_KEY = os.environ.get('SECRET_KEY') or os.urandom(32)
 
+    DEBUG = False
 
-# TODO IMPLEMENT DATABASE URL
-SQLALCHEMY_DATABASE_URI = 'postgresql://postgres:@localhost:5432/fyyur'
-SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Connect to the database
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'postgresql://postgres:@localhost:5432/fyyur')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Connection pool, per process: keep workers x (size + overflow) below max_connections
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = True
+    # milliseconds, 0 disables
+    DB_STATEMENT_TIMEOUT = int(os.environ.get('DB_STATEMENT_TIMEOUT', 0))
+
+    # Read replicas, comma separated. Read-only endpoints are spread over them,
+    # everything else and any visitor who wrote in the last DB_STICKY_SECONDS uses the primary
+    DB_REPLICA_URIS = [uri for uri in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if uri]
+    DB_STICKY_SECONDS = int(os.environ.get('DB_STICKY_SECONDS', 10))
+    DB_REPLICA_ENDPOINTS = [
+        'index',
+        'venues.venues', 'venues.show_venue', 'venues.search_venues',
+        'artists.artists', 'artists.show_artist', 'artists.search_artists',
+        'shows.shows',
+        'api.*',
+        'export',
+    ]
+
+    # Keyset pagination for the listing pages
+    PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+
+    # Maximum number of artist/venue search results
+    SEARCH_LIMIT = 50
+
+    # Rendered page cache, 'lru' (per process) or 'redis'. Writes only clear the
+    # LRU of the process that handled them, run more than one worker with 'redis'
+    CACHE_ENABLED = True
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'lru')
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_TTL = 300
+    CACHE_MAX_ENTRIES = 1024
+
+    # Dates are shown in these unless the visitor sets `locale`/`tz` cookies
+    DEFAULT_LOCALE = os.environ.get('DEFAULT_LOCALE', 'en')
+    DEFAULT_TIMEZONE = os.environ.get('DEFAULT_TIMEZONE', 'UTC')
+
+    # Response compression, bodies smaller than this are sent as is
+    COMPRESS_MIN_SIZE = 500
+    COMPRESS_GZIP_LEVEL = 6
+    COMPRESS_BROTLI_QUALITY = 4
+
+    # (endpoint pattern, Cache-Control, Vary) for GET responses, first match wins.
+    # Listing pages may be served stale while a shared cache revalidates them;
+    # HTML pages vary on Cookie, dates are rendered in the locale and tz cookies.
+    HTTP_CACHE_POLICIES = [
+        ('index', 'public, max-age=300', ('Cookie',)),
+        ('venues.venues', 'public, max-age=30, stale-while-revalidate=300', ('Cookie',)),
+        ('artists.artists', 'public, max-age=30, stale-while-revalidate=300', ('Cookie',)),
+        ('shows.shows', 'public, max-age=30, stale-while-revalidate=300', ('Cookie',)),
+        ('venues.show_venue', 'public, max-age=30, stale-while-revalidate=60', ('Cookie',)),
+        ('artists.show_artist', 'public, max-age=30, stale-while-revalidate=60', ('Cookie',)),
+        ('api.*', 'public, no-cache', ()),
+        ('export', 'private, no-store', ()),
+        ('metrics', 'no-store', ()),
+    ]
+    HTTP_CACHE_DEFAULT = 'no-cache'
+
+    # Background jobs, 'memory' (per process) or 'database' (durable, the jobs table).
+    # JOBS_WORKERS threads per process run them; with 0, run `flask jobs work` separately
+    JOBS_BACKEND = os.environ.get('JOBS_BACKEND', 'memory')
+    JOBS_WORKERS = int(os.environ.get('JOBS_WORKERS', 2))
+    JOBS_EAGER = False
+    JOBS_MAX_ATTEMPTS = 5
+    # seconds, doubled after every failed attempt
+    JOBS_RETRY_DELAY = 2
+    JOBS_POLL_INTERVAL = 1.0
+    # running jobs locked longer than this are assumed lost and run again
+    JOBS_LOCK_TIMEOUT = 300
+
+    # How many days ahead the upcoming shows feed table reaches
+    FEED_DAYS = int(os.environ.get('FEED_DAYS', 90))
+
+    # Image proxy, image_link images are fetched once and served as thumbnails from /img/.
+    # IMAGE_FETCHER 'http', or 'local' to read files named like the link from IMAGE_LOCAL_DIR
+    IMAGE_CACHE_DIR = os.environ.get('IMAGE_CACHE_DIR', os.path.join(basedir, 'instance', 'images'))
+    IMAGE_CACHE_MAX_BYTES = int(os.environ.get('IMAGE_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+    IMAGE_FETCHER = os.environ.get('IMAGE_FETCHER', 'http')
+    IMAGE_LOCAL_DIR = os.environ.get('IMAGE_LOCAL_DIR', os.path.join(basedir, 'static', 'img'))
+    IMAGE_FETCH_TIMEOUT = 10
+    IMAGE_MAX_BYTES = 10 * 1024 * 1024
+    # name -> largest (width, height), twice the CSS box the image is shown in
+    IMAGE_SIZES = {'tile': (720, 400), 'detail': (1200, 1000)}
+
+    # How long a show books its artist and venue for
+    SHOW_DURATION_MINUTES = int(os.environ.get('SHOW_DURATION_MINUTES', 180))
+
+    # Serve the venue/artist detail pages from async views over asyncpg
+    # (needs Flask[async] and asyncpg, run under asgi.py for an ASGI server)
+    ASYNC_MODE = os.environ.get('ASYNC_MODE') == '1'
+
+    @property
+    def SQLALCHEMY_BINDS(self):
+        return {f'replica_{index}': uri for index, uri in enumerate(self.DB_REPLICA_URIS)}
+
+    @property
+    def SQLALCHEMY_ENGINE_OPTIONS(self):
+        options = {
+            'pool_size': self.DB_POOL_SIZE,
+            'max_overflow': self.DB_MAX_OVERFLOW,
+            'pool_timeout': self.DB_POOL_TIMEOUT,
+            'pool_recycle': self.DB_POOL_RECYCLE,
+            'pool_pre_ping': self.DB_POOL_PRE_PING,
+        }
+        if self.DB_STATEMENT_TIMEOUT:
+            options['connect_args'] = {'options': f'-c statement_timeout={self.DB_STATEMENT_TIMEOUT}'}
+        return options
+
+
+class DevelopmentConfig(Config):
+    # Enable debug mode.
+    DEBUG = True
+
+
+class ProductionConfig(Config):
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 5))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 10))
+    DB_STATEMENT_TIMEOUT = int(os.environ.get('DB_STATEMENT_TIMEOUT', 5000))
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL', 'postgresql://postgres:@localhost:5432/fyyur_test')
+    CACHE_ENABLED = False
+    WTF_CSRF_ENABLED = False
+    JOBS_EAGER = True
+    IMAGE_FETCHER = 'local'
+
+
+configs = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'testing': TestingConfig,
+}
+
+
+def get_config(name=None):
+    #FYYUR_ENV picks the config class, development by default
+    return configs[name or os.environ.get('FYYUR_ENV', 'development')]()
@@ -0,0 +1,97 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import click
+from flask import abort, Response, stream_with_context
+
+#----------------------------------------------------------------------------#
+# Bulk export.
+#----------------------------------------------------------------------------#
+
+# kind -> model name, same kinds as the importer
+EXPORT_KINDS = {
+    'artists': 'Artist',
+    'venues': 'Venue',
+    'shows': 'Show',
+}
+
+EXPORT_MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+DERIVED_COLUMNS = {'search_vector', 'upcoming_shows_count', 'past_shows_count'}
+
+# rows fetched per round trip from the server side cursor
+EXPORT_BATCH_SIZE = 1000
+
+
+def export_columns(model):
+    #derived columns are rebuilt on import, leave them out
+    return [column for column in model.__table__.columns if column.key not in DERIVED_COLUMNS]
+
+
+def export_rows(kind):
+    #Stream rows through a server side cursor, only one batch is held in memory
+    import models
+
+    model = getattr(models, EXPORT_KINDS[kind])
+    columns = export_columns(model)
+    query = models.db.session.query(*columns).order_by(model.id)
+    return [column.key for column in columns], query.execution_options(stream_results=True).yield_per(EXPORT_BATCH_SIZE)
+
+
+def format_value(value, file_format):
+    #Values formatted so `flask import` reads them back unchanged
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, list) and file_format == 'csv':
+        return ','.join(value)
+    if isinstance(value, bool) and file_format == 'csv':
+        #an empty cell is an unticked checkbox to the import forms
+        return 'y' if value else ''
+    return value
+
+
+def generate(kind, file_format):
+    keys, rows = export_rows(kind)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if file_format == 'csv':
+        writer.writerow(keys)
+
+    for row in rows:
+        if file_format == 'ndjson':
+            buffer.write(json.dumps({key: format_value(value, file_format) for key, value in zip(keys, row)}) + '\n')
+        else:
+            writer.writerow([format_value(value, file_format) for value in row])
+        #flush roughly every 64KB instead of per row, each chunk costs a compressor flush and a write
+        if buffer.tell() > 65536:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export(kind, file_format):
+    if kind not in EXPORT_KINDS or file_format not in EXPORT_MIMETYPES:
+        abort(404)
+
+    response = Response(stream_with_context(generate(kind, file_format)), mimetype=EXPORT_MIMETYPES[file_format])
+    response.headers['Content-Disposition'] = f'attachment; filename={kind}.{file_format}'
+    return response
+
+
+def init_app(app):
+    app.add_url_rule('/export/<kind>.<file_format>', 'export', export)
+
+    @app.cli.command('export')
+    @click.argument('kind', type=click.Choice(sorted(EXPORT_KINDS)))
+    @click.option('--format', 'file_format', type=click.Choice(sorted(EXPORT_MIMETYPES)), default='ndjson', show_default=True)
+    @click.option('--output', '-o', type=click.File('w', encoding='utf-8'), default='-', help='Defaults to stdout.')
+    def export_command(kind, file_format, output):
+        """Stream artists, venues or shows to a CSV or NDJSON file."""
+        for chunk in generate(kind, file_format):
+            output.write(chunk)
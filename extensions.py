@@ -0,0 +1,28 @@
+from flask_moment import Moment
+
+from assets import Assets
+from cache import PageCache
+from images import ImageProxy
+from jobs import JobQueue
+from middleware import CachePolicy
+from pool import PoolMetrics
+from profiler import RequestProfiler
+from replicas import RoutingSQLAlchemy, ReplicaRouter
+
+#----------------------------------------------------------------------------#
+# Extensions.
+#----------------------------------------------------------------------------#
+
+# Created unbound here and bound in create_app(), so models and blueprints
+# can import them without importing the app.
+
+db = RoutingSQLAlchemy()
+replica_router = ReplicaRouter()
+moment = Moment()
+profiler = RequestProfiler()
+pool_metrics = PoolMetrics()
+page_cache = PageCache(tables=('venues', 'artists', 'shows'))
+job_queue = JobQueue()
+assets = Assets()
+cache_policy = CachePolicy()
+image_proxy = ImageProxy()
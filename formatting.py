@@ -0,0 +1,91 @@
+from datetime import datetime
+from functools import lru_cache
+
+from flask import current_app, g, has_request_context, request
+
+#----------------------------------------------------------------------------#
+# Date formatting.
+#----------------------------------------------------------------------------#
+
+DATETIME_FORMATS = {
+    'full': "EEEE MMMM, d, y 'at' h:mma",
+    'medium': "EE MM, dd, y h:mma",
+}
+
+# babel and dateutil are imported on first use rather than at worker startup
+
+
+@lru_cache(maxsize=64)
+def get_locale(name):
+    import babel
+    try:
+        return babel.Locale.parse(name)
+    except (ValueError, babel.UnknownLocaleError):
+        return None
+
+
+@lru_cache(maxsize=64)
+def get_pattern(format):
+    import babel.dates
+    return babel.dates.parse_pattern(DATETIME_FORMATS[format])
+
+
+@lru_cache(maxsize=64)
+def get_timezone(name):
+    import babel.dates
+    try:
+        return babel.dates.get_timezone(name)
+    except LookupError:
+        return None
+
+
+def to_datetime(value):
+    #Native datetimes pass straight through, strings take the ISO fast path first
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        import dateutil.parser
+        return dateutil.parser.parse(value)
+
+
+def display_settings():
+    #(locale, timezone) for the current user from the `locale`/`tz` cookies, resolved once per request
+    config = current_app.config
+    if not has_request_context():
+        return config['DEFAULT_LOCALE'], config['DEFAULT_TIMEZONE']
+    if 'display_settings' not in g:
+        locale = request.cookies.get('locale', config['DEFAULT_LOCALE'])
+        tz = request.cookies.get('tz', config['DEFAULT_TIMEZONE'])
+        g.display_settings = (
+            locale if get_locale(locale) else config['DEFAULT_LOCALE'],
+            tz if get_timezone(tz) else config['DEFAULT_TIMEZONE'],
+        )
+    return g.display_settings
+
+
+@lru_cache(maxsize=16384)
+def format_cached(value, format, locale, tz):
+    #naive datetimes are the venue's wall-clock time and shown as stored, aware ones in the visitor's timezone
+    if value.tzinfo is not None:
+        value = value.astimezone(get_timezone(tz))
+    if format in DATETIME_FORMATS:
+        return get_pattern(format).apply(value, get_locale(locale))
+    #babel's own named formats ('short', 'long') and raw patterns
+    import babel.dates
+    return babel.dates.format_datetime(value, format, tzinfo=value.tzinfo, locale=get_locale(locale))
+
+
+def format_datetime(value, format='medium', locale=None, tz=None):
+    if value is None or value == '':
+        return ''
+    if locale is None or tz is None:
+        default_locale, default_tz = display_settings()
+        locale = locale or default_locale
+        tz = tz or default_tz
+    return format_cached(to_datetime(value), format, locale, tz)
+
+
+def init_app(app):
+    app.jinja_env.filters['datetime'] = format_datetime
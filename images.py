@@ -0,0 +1,376 @@
+import hashlib
+import io
+import ipaddress
+import os
+import re
+import socket
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import click
+from flask import abort, current_app, redirect, request, Response, url_for
+
+from assets import IMMUTABLE
+
+#----------------------------------------------------------------------------#
+# Image proxy.
+#----------------------------------------------------------------------------#
+
+# format -> (mimetype, Pillow format, save options)
+FORMATS = {
+    'webp': ('image/webp', 'WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('image/jpeg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+KEY_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+# cached files are touched at most this often, so hits don't write on every request
+TOUCH_INTERVAL = 3600
+
+# file under the cache root while an eviction is scheduled or running, shared by every process;
+# one older than EVICT_TIMEOUT seconds is left from an eviction that died and is taken over
+EVICT_MARKER = 'evicting'
+EVICT_TIMEOUT = 600
+
+
+class ImageError(Exception):
+    pass
+
+
+def url_key(url):
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]
+
+
+#  Fetchers
+#  ----------------------------------------------------------------
+
+
+def check_host(hostname):
+    #image links are user input, never let them reach internal addresses
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(hostname, None)}
+    except (socket.gaierror, UnicodeError) as error:
+        raise ImageError(f'Cannot resolve {hostname}: {error}')
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split('%')[0])
+        if not ip.is_global:
+            raise ImageError(f'{hostname} resolves to non-public address {ip}')
+
+
+class CheckedRedirectHandler(urllib.request.HTTPRedirectHandler):
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        check_host(urllib.parse.urlsplit(newurl).hostname or '')
+        return super(CheckedRedirectHandler, self).redirect_request(req, fp, code, msg, headers, newurl)
+
+
+class HttpFetcher(object):
+    #Downloads http(s) image links with a timeout and a size cap
+
+    def __init__(self, timeout=10, max_bytes=10 * 1024 * 1024):
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.opener = urllib.request.build_opener(CheckedRedirectHandler)
+
+    def fetch(self, url):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ImageError(f'Not an http(s) URL: {url}')
+        check_host(parts.hostname)
+
+        try:
+            with self.opener.open(urllib.request.Request(url, headers={'User-Agent': 'fyyur-image-proxy'}), timeout=self.timeout) as response:
+                body = response.read(self.max_bytes + 1)
+        except (OSError, ValueError, urllib.error.URLError) as error:
+            raise ImageError(f'Fetching {url} failed: {error}')
+        if len(body) > self.max_bytes:
+            raise ImageError(f'{url} is larger than {self.max_bytes} bytes')
+        return body
+
+
+class LocalFetcher(object):
+    #Resolves image links to files of the same name under a directory, for development and tests offline
+
+    def __init__(self, root):
+        self.root = root
+
+    def fetch(self, url):
+        name = os.path.basename(urllib.parse.urlsplit(url).path)
+        try:
+            with open(os.path.join(self.root, name), 'rb') as f:
+                return f.read()
+        except OSError as error:
+            raise ImageError(f'No local file for {url}: {error}')
+
+
+def make_fetcher(config):
+    if config['IMAGE_FETCHER'] == 'local':
+        return LocalFetcher(config['IMAGE_LOCAL_DIR'])
+    return HttpFetcher(timeout=config['IMAGE_FETCH_TIMEOUT'], max_bytes=config['IMAGE_MAX_BYTES'])
+
+
+#  Disk cache
+#  ----------------------------------------------------------------
+
+
+class DiskCache(object):
+    #Files keyed by the link's hash: sources/<key> holds the link, digests/<key> the sha256 of
+    #its bytes. The images are stored under that sha256, originals/<sha256> and
+    #thumbs/<sha256>/<size>.<format>, so links to the same image share them. Originals and
+    #thumbnails are evicted least recently used first once they pass max_bytes.
+
+    EVICTABLE = ('originals', 'thumbs')
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.total = None
+        self.lock = threading.Lock()
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def read(self, *parts):
+        path = self.path(*parts)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        if time.time() - os.path.getmtime(path) > TOUCH_INTERVAL:
+            os.utime(path)
+        return data
+
+    def read_text(self, *parts):
+        data = self.read(*parts)
+        return data.decode('utf-8') if data is not None else None
+
+    def write(self, data, *parts):
+        #write to a temp file and rename, readers never see half a file
+        path = self.path(*parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        if parts[0] in self.EVICTABLE:
+            with self.lock:
+                self.total = self.size() if self.total is None else self.total + len(data)
+
+    def files(self):
+        for directory in self.EVICTABLE:
+            for dirpath, _, filenames in os.walk(self.path(directory)):
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, path
+
+    def size(self):
+        return sum(size for _, size, _ in self.files())
+
+    def over_limit(self):
+        #True for one caller across all processes until evict() has run
+        with self.lock:
+            if self.total is None or self.total <= self.max_bytes or not self.claim_eviction():
+                return False
+            #the eviction may run in another process, measure again on the next write
+            self.total = None
+            return True
+
+    def claim_eviction(self):
+        path = self.path(EVICT_MARKER)
+        try:
+            if time.time() - os.path.getmtime(path) < EVICT_TIMEOUT:
+                return False
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return False
+        return True
+
+    def evict(self):
+        #Delete the least recently used files until 90% of max_bytes is left
+        files = sorted(self.files())
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * 0.9
+        removed = 0
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        with self.lock:
+            self.total = total
+        try:
+            os.remove(self.path(EVICT_MARKER))
+        except FileNotFoundError:
+            pass
+        return removed
+
+
+#  Thumbnails
+#  ----------------------------------------------------------------
+
+
+def render_thumbnail(original, box, fmt):
+    #Downscale to fit box, never upscale, and encode as fmt
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        raise ImageError('Pillow is not installed')
+
+    _, pil_format, options = FORMATS[fmt]
+    try:
+        with Image.open(io.BytesIO(original)) as image:
+            image.draft('RGB', box)
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail(box, Image.LANCZOS)
+            if image.mode not in ('RGB', 'RGBA', 'L'):
+                image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+            if fmt == 'jpeg' and image.mode == 'RGBA':
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel('A'))
+                image = background
+            buffer = io.BytesIO()
+            image.save(buffer, pil_format, **options)
+            return buffer.getvalue()
+    except Exception as error:
+        raise ImageError(f'Cannot make a thumbnail: {error}')
+
+
+class ImageProxy(object):
+
+    def __init__(self, app=None):
+        self.locks = [threading.Lock() for _ in range(64)]
+        self.known = set()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.fetcher = make_fetcher(app.config)
+        self.cache = DiskCache(app.config['IMAGE_CACHE_DIR'], app.config['IMAGE_CACHE_MAX_BYTES'])
+        self.sizes = app.config['IMAGE_SIZES']
+        app.add_url_rule('/img/<key>/<size>', 'image', self.serve)
+        app.jinja_env.globals['image_url'] = self.image_url
+        app.extensions['image_proxy'] = self
+
+        @app.cli.group('images')
+        def images_group():
+            """Image proxy cache."""
+
+        @images_group.command('evict')
+        def evict_command():
+            """Trim the image cache to IMAGE_CACHE_MAX_BYTES."""
+            click.echo(f'Removed {self.cache.evict()} files.')
+
+        @images_group.command('prefetch')
+        def prefetch_command():
+            """Fetch every venue and artist image link not in the cache yet."""
+            from models import Artist, Venue
+            links = {link for model in (Venue, Artist) for (link,) in model.query.with_entities(model.image_link) if link}
+            failed = 0
+            for link in links:
+                try:
+                    self.prefetch(link)
+                except ImageError as error:
+                    click.echo(str(error), err=True)
+                    failed += 1
+            click.echo(f'{len(links) - failed} of {len(links)} image links cached.')
+
+    def image_url(self, link, size):
+        #/img/<key>/<size> for an http(s) image link, anything else is returned as is
+        if not link or not link.startswith(('http://', 'https://')):
+            return link
+        key = url_key(link)
+        if key not in self.known:
+            if not os.path.exists(self.cache.path('sources', key)):
+                self.cache.write(link.encode('utf-8'), 'sources', key)
+            self.known.add(key)
+        return url_for('image', key=key, size=size)
+
+    def lock_for(self, key):
+        return self.locks[int(key[:8], 16) % len(self.locks)]
+
+    def thumbnail(self, key, link, size, fmt):
+        #Thumbnail bytes, fetching the link only when its original is not on disk
+        digest = self.cache.read_text('digests', key)
+        data = self.cache.read('thumbs', digest, f'{size}.{fmt}') if digest else None
+        if data is not None:
+            return digest, data
+
+        #one fetch per link in this process, concurrent requests wait for it
+        with self.lock_for(key):
+            digest = self.cache.read_text('digests', key)
+            original = None
+            if digest:
+                data = self.cache.read('thumbs', digest, f'{size}.{fmt}')
+                if data is not None:
+                    return digest, data
+                original = self.cache.read('originals', digest)
+
+            if original is None:
+                original = self.fetcher.fetch(link)
+                digest = hashlib.sha256(original).hexdigest()
+                self.cache.write(original, 'originals', digest)
+                self.cache.write(digest.encode('utf-8'), 'digests', key)
+
+            data = render_thumbnail(original, tuple(self.sizes[size]), fmt)
+            self.cache.write(data, 'thumbs', digest, f'{size}.{fmt}')
+
+        self.schedule_eviction()
+        return digest, data
+
+    def prefetch(self, link):
+        #Fetch a link and render every size and format ahead of the first page view
+        key = url_key(link)
+        if not os.path.exists(self.cache.path('sources', key)):
+            self.cache.write(link.encode('utf-8'), 'sources', key)
+        for size in self.sizes:
+            for fmt in FORMATS:
+                self.thumbnail(key, link, size, fmt)
+
+    def schedule_eviction(self):
+        if not self.cache.over_limit():
+            return
+        jobs = current_app.extensions.get('job_queue')
+        if jobs is not None and not jobs.eager:
+            jobs.enqueue('evict_image_cache')
+        else:
+            self.cache.evict()
+
+    def serve(self, key, size):
+        if not KEY_PATTERN.match(key) or size not in self.sizes:
+            abort(404)
+        link = self.cache.read_text('sources', key)
+        if link is None:
+            abort(404)
+
+        fmt = 'webp' if 'image/webp' in request.headers.get('Accept', '') else 'jpeg'
+        try:
+            digest, data = self.thumbnail(key, link, size, fmt)
+        except ImageError as error:
+            #fall back to the original, and try again on the next request
+            current_app.logger.warning(str(error))
+            response = redirect(link)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+
+        response = Response(data, mimetype=FORMATS[fmt][0])
+        response.headers['Cache-Control'] = IMMUTABLE
+        response.vary.add('Accept')
+        response.set_etag(f'{digest[:16]}-{size}-{fmt}')
+        return response.make_conditional(request)
@@ -0,0 +1,214 @@
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from itertools import islice
+
+import click
+from flask import current_app
+from werkzeug.datastructures import MultiDict
+
+#----------------------------------------------------------------------------#
+# Bulk import.
+#----------------------------------------------------------------------------#
+
+# kind -> (model name, form name)
+IMPORT_KINDS = {
+    'artists': ('Artist', 'ArtistForm'),
+    'venues': ('Venue', 'VenueForm'),
+    'shows': ('Show', 'ShowForm'),
+}
+
+
+def read_rows(path, file_format):
+    #Yield (line number, row dict) one at a time so memory stays flat; a malformed NDJSON line comes as its text
+    with open(path, newline='', encoding='utf-8') as f:
+        if file_format == 'csv':
+            for line, row in enumerate(csv.DictReader(f), start=2):
+                if row.get('genres'):
+                    row['genres'] = [genre.strip() for genre in row['genres'].split(',') if genre.strip()]
+                yield line, row
+        else:
+            for line, text in enumerate(f, start=1):
+                if not text.strip():
+                    continue
+                try:
+                    row = json.loads(text)
+                except ValueError:
+                    #malformed lines go to the rejects report like any other bad row
+                    row = text.rstrip('\r\n')
+                yield line, row
+
+
+# columns the forms don't have, kept from the row when present so an export re-imports as is
+KEPT_COLUMNS = {
+    'id': int,
+    'end_time': datetime.fromisoformat,
+    'updated_at': datetime.fromisoformat,
+}
+
+
+def to_formdata(row):
+    formdata = MultiDict()
+    for key, value in row.items():
+        if isinstance(value, list):
+            formdata.setlist(key, [str(item) for item in value])
+        elif isinstance(value, bool):
+            #like a checkbox: sent when ticked, absent otherwise
+            if value:
+                formdata[key] = 'y'
+        elif value is not None:
+            formdata[key] = str(value)
+    return formdata
+
+
+def group_by_columns(batch):
+    #executemany needs the same keys in every row
+    groups = {}
+    for values in batch:
+        groups.setdefault(tuple(sorted(values)), []).append(values)
+    return groups.values()
+
+
+class Importer(object):
+
+    def __init__(self, kind, chunk_size=5000, rejects=None):
+        import forms
+        import models
+
+        model_name, form_name = IMPORT_KINDS[kind]
+        self.kind = kind
+        self.db = models.db
+        self.refresh_show_counts = models.refresh_show_counts
+        self.refresh_genre_facets = models.refresh_genre_facets
+        self.refresh_upcoming_shows = models.refresh_upcoming_shows
+        self.model = getattr(models, model_name)
+        self.form_class = getattr(forms, form_name)
+        self.columns = {column.key for column in self.model.__table__.columns} - {'id', 'search_vector', 'upcoming_shows_count', 'past_shows_count'}
+        self.chunk_size = chunk_size
+        self.rejects = rejects
+        self.inserted = 0
+        self.rejected = 0
+        self.kept_ids = False
+
+        if kind == 'shows':
+            #show foreign keys are checked against id sets loaded once, not per row
+            self.artist_ids = {id for (id,) in self.db.session.query(models.Artist.id)}
+            self.venue_ids = {id for (id,) in self.db.session.query(models.Venue.id)}
+
+    def validate(self, row):
+        #Same validation as the create forms, returns (values, errors)
+        if not isinstance(row, dict):
+            return None, {'row': 'Not a JSON object.'}
+
+        form = self.form_class(formdata=to_formdata(row), meta={'csrf': False})
+        if not form.validate():
+            return None, {field: ', '.join(messages) for field, messages in form.errors.items()}
+
+        values = {key: value for key, value in form.data.items() if key in self.columns}
+        for key, parse in KEPT_COLUMNS.items():
+            if key in self.model.__table__.columns and row.get(key) not in (None, ''):
+                try:
+                    values[key] = parse(row[key])
+                except (TypeError, ValueError):
+                    return None, {key: 'Not a valid value.'}
+
+        if self.kind == 'shows':
+            errors = {}
+            try:
+                values['artist_id'] = int(values['artist_id'])
+                values['venue_id'] = int(values['venue_id'])
+            except (TypeError, ValueError):
+                return None, {'artist_id/venue_id': 'Not a valid integer.'}
+            if values['artist_id'] not in self.artist_ids:
+                errors['artist_id'] = 'Unknown artist.'
+            if values['venue_id'] not in self.venue_ids:
+                errors['venue_id'] = 'Unknown venue.'
+            #an empty tsrange would make the period indexes reject the whole chunk
+            if 'end_time' in values and values['end_time'] <= values['start_time']:
+                errors['end_time'] = 'Must be after start_time.'
+            if errors:
+                return None, errors
+
+        return values, None
+
+    def run(self, rows):
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+
+            batch = []
+            for line, row in chunk:
+                values, errors = self.validate(row)
+                if errors:
+                    self.reject(line, row, errors)
+                else:
+                    batch.append(values)
+
+            if batch:
+                #one executemany per chunk, committed so a failure only loses this chunk
+                for group in group_by_columns(batch):
+                    self.db.session.execute(self.model.__table__.insert(), group)
+                self.kept_ids = self.kept_ids or any('id' in values for values in batch)
+                if self.kind == 'shows':
+                    self.refresh_show_counts(
+                        venue_ids={values['venue_id'] for values in batch},
+                        artist_ids={values['artist_id'] for values in batch}
+                    )
+                self.db.session.commit()
+                self.inserted += len(batch)
+
+    def finish(self):
+        #core inserts skip the ORM facet and feed hooks, rebuild them once at the end
+        if not self.inserted:
+            return
+        if self.kind == 'shows':
+            self.refresh_upcoming_shows()
+        else:
+            self.refresh_genre_facets()
+        if self.kept_ids:
+            #rows brought their own ids, move the sequence past them
+            table = self.model.__tablename__
+            self.db.session.execute(self.db.text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"))
+        self.db.session.commit()
+
+    def reject(self, line, row, errors):
+        self.rejected += 1
+        if self.rejects is not None:
+            self.rejects.writerow([line, json.dumps(errors), json.dumps(row, default=str)])
+
+
+def init_app(app):
+
+    @app.cli.command('import')
+    @click.argument('kind', type=click.Choice(sorted(IMPORT_KINDS)))
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'file_format', type=click.Choice(['csv', 'ndjson']), help='Defaults to the file extension.')
+    @click.option('--chunk-size', default=5000, show_default=True, help='Rows per INSERT batch and commit.')
+    @click.option('--rejects', 'rejects_path', type=click.Path(dir_okay=False), help='Rejected rows report, defaults to PATH.rejects.csv.')
+    def import_command(kind, path, file_format, chunk_size, rejects_path):
+        """Bulk load artists, venues or shows from a CSV or NDJSON file."""
+        file_format = file_format or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        rejects_path = rejects_path or f'{path}.rejects.csv'
+        started = time.perf_counter()
+
+        with open(rejects_path, 'w', newline='', encoding='utf-8') as f:
+            rejects = csv.writer(f)
+            rejects.writerow(['line', 'errors', 'row'])
+            importer = Importer(kind, chunk_size=chunk_size, rejects=rejects)
+            importer.run(read_rows(path, file_format))
+            importer.finish()
+
+        if importer.rejected == 0:
+            os.remove(rejects_path)
+
+        #rows were inserted behind the ORM's back, drop any cached pages
+        if 'page_cache' in current_app.extensions:
+            current_app.extensions['page_cache'].clear()
+
+        click.echo(f'Imported {importer.inserted} {kind} in {time.perf_counter() - started:.1f}s, rejected {importer.rejected}.')
+        if importer.rejected:
+            click.echo(f'Rejected rows written to {rejects_path}')
@@ -0,0 +1,268 @@
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+
+import click
+
+#----------------------------------------------------------------------------#
+# Background jobs.
+#----------------------------------------------------------------------------#
+
+# Every backend hands out jobs as {'id', 'name', 'args', 'attempts'} dicts,
+# attempts already counting the run that pop() hands the job out for.
+
+
+class MemoryBackend(object):
+    #Per process queue, pending jobs are lost when the process exits
+
+    def __init__(self):
+        self.heap = []
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+
+    def push(self, job, delay=0):
+        with self.condition:
+            heapq.heappush(self.heap, (time.monotonic() + delay, next(self.counter), job))
+            self.condition.notify()
+
+    def pop(self, timeout):
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                if self.heap and self.heap[0][0] <= now:
+                    job = heapq.heappop(self.heap)[2]
+                    job['attempts'] += 1
+                    return job
+                if now >= deadline:
+                    return None
+                wait = deadline - now
+                if self.heap:
+                    wait = min(wait, self.heap[0][0] - now)
+                self.condition.wait(wait)
+
+    def done(self, job):
+        pass
+
+    def retry(self, job, delay, error):
+        self.push(job, delay)
+
+    def fail(self, job, error):
+        pass
+
+    def depth(self):
+        with self.condition:
+            return len(self.heap)
+
+
+class DatabaseBackend(object):
+    #Durable queue in the jobs table, workers in any process claim rows with SKIP LOCKED
+
+    CLAIM = """
+        UPDATE jobs SET status = 'running', locked_at = timezone('utc', now()), attempts = attempts + 1
+        WHERE id = (
+            SELECT id FROM jobs
+            WHERE (status = 'queued' AND run_at <= timezone('utc', now()))
+               OR (status = 'running' AND locked_at < timezone('utc', now()) - make_interval(secs => :lock_timeout))
+            ORDER BY run_at
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, name, args, attempts
+    """
+
+    def __init__(self, db, poll_interval=1.0, lock_timeout=300):
+        self.db = db
+        self.poll_interval = poll_interval
+        self.lock_timeout = lock_timeout
+
+    def execute(self, statement, **params):
+        #own short transaction on the primary, independent of the request's session
+        with self.db.engine.begin() as connection:
+            connection.execute(self.db.text(statement), params)
+
+    def fetch(self, statement, **params):
+        #same, for statements returning rows; fetched before the transaction ends
+        with self.db.engine.begin() as connection:
+            return connection.execute(self.db.text(statement), params).fetchall()
+
+    def push(self, job, delay=0):
+        self.execute(
+            "INSERT INTO jobs (name, args, run_at) VALUES (:name, CAST(:args AS jsonb), timezone('utc', now()) + make_interval(secs => :delay))",
+            name=job['name'], args=json.dumps(job['args']), delay=delay
+        )
+
+    def pop(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            rows = self.fetch(self.CLAIM, lock_timeout=self.lock_timeout)
+            if rows:
+                return dict(rows[0]._mapping) if hasattr(rows[0], '_mapping') else dict(rows[0])
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(self.poll_interval, remaining))
+
+    def done(self, job):
+        self.execute('DELETE FROM jobs WHERE id = :id', id=job['id'])
+
+    def retry(self, job, delay, error):
+        self.execute(
+            "UPDATE jobs SET status = 'queued', locked_at = NULL, last_error = :error, run_at = timezone('utc', now()) + make_interval(secs => :delay) WHERE id = :id",
+            id=job['id'], error=error, delay=delay
+        )
+
+    def fail(self, job, error):
+        #failed rows stay in the table for inspection
+        self.execute("UPDATE jobs SET status = 'failed', locked_at = NULL, last_error = :error WHERE id = :id", id=job['id'], error=error)
+
+    def depth(self):
+        return self.fetch("SELECT count(*) FROM jobs WHERE status = 'queued'")[0][0]
+
+
+def make_backend(config, db):
+    if config['JOBS_BACKEND'] == 'database':
+        return DatabaseBackend(db, poll_interval=config['JOBS_POLL_INTERVAL'], lock_timeout=config['JOBS_LOCK_TIMEOUT'])
+    return MemoryBackend()
+
+
+class JobQueue(object):
+    #Runs registered tasks on worker threads after the request that enqueued them
+
+    def __init__(self, app=None, db=None):
+        self.tasks = {}
+        self.lock = threading.Lock()
+        self.stats = {'enqueued': 0, 'succeeded': 0, 'retried': 0, 'failed': 0, 'run_time': 0.0}
+        self.pid = None
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.app = app
+        self.db = db
+        self.backend = make_backend(app.config, db)
+        self.workers = app.config['JOBS_WORKERS']
+        self.eager = app.config['JOBS_EAGER']
+        self.max_attempts = app.config['JOBS_MAX_ATTEMPTS']
+        self.retry_delay = app.config['JOBS_RETRY_DELAY']
+        app.extensions['job_queue'] = self
+        if 'profiler' in app.extensions:
+            app.extensions['profiler'].register_collector(self.collect)
+
+        @app.cli.group('jobs')
+        def jobs_group():
+            """Background job queue."""
+
+        @jobs_group.command('work')
+        @click.option('--workers', default=2, show_default=True, help='Worker threads.')
+        def work_command(workers):
+            """Run jobs from the queue until interrupted."""
+            if app.config['JOBS_BACKEND'] == 'memory':
+                click.echo('JOBS_BACKEND is memory, this process will only see jobs it enqueues itself.')
+            self.start(workers)
+            try:
+                while True:
+                    time.sleep(60)
+            except KeyboardInterrupt:
+                pass
+
+        @jobs_group.command('status')
+        def status_command():
+            """Show the number of queued jobs."""
+            click.echo(f'{self.backend.depth()} queued')
+
+    def task(self, func):
+        #Register a task under its function name, arguments must be JSON serializable
+        self.tasks[func.__name__] = func
+        return func
+
+    def enqueue(self, name, **kwargs):
+        self.enqueue_in(0, name, **kwargs)
+
+    def enqueue_in(self, delay, name, **kwargs):
+        #Run the task no sooner than delay seconds from now; eager queues run it right away
+        if name not in self.tasks:
+            raise LookupError(f'Unknown job {name}')
+
+        job = {'id': None, 'name': name, 'args': kwargs, 'attempts': 0}
+        self._count('enqueued')
+        if self.eager:
+            job['attempts'] = 1
+            self.run(job)
+            return
+
+        self.backend.push(job, delay)
+        self.start(self.workers)
+
+    def start(self, workers):
+        #Worker threads start on first use in each process, so forked workers get their own
+        with self.lock:
+            if self.pid == os.getpid() or not workers:
+                return
+            self.pid = os.getpid()
+
+        for index in range(workers):
+            threading.Thread(target=self.work, name=f'job-worker-{index}', daemon=True).start()
+
+    def work(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    job = self.backend.pop(timeout=5)
+                    if job is not None:
+                        self.run(job)
+            except Exception:
+                #backend unavailable, back off instead of spinning
+                self.app.logger.exception('Job worker error')
+                time.sleep(self.retry_delay)
+
+    def run(self, job):
+        started = time.perf_counter()
+        try:
+            self.tasks[job['name']](**job['args'])
+            self.db.session.commit()
+        except Exception as error:
+            self.db.session.rollback()
+            message = f'{type(error).__name__}: {error}'
+            if self.eager:
+                raise
+            if job['attempts'] < self.max_attempts:
+                self._count('retried')
+                self.backend.retry(job, self.retry_delay * 2 ** (job['attempts'] - 1), message)
+            else:
+                self._count('failed')
+                self.app.logger.error(f"Job {job['name']} failed after {job['attempts']} attempts: {message}")
+                self.backend.fail(job, message)
+        else:
+            self._count('succeeded')
+            self.backend.done(job)
+        finally:
+            self._count('run_time', time.perf_counter() - started)
+
+    def _count(self, counter, amount=1):
+        with self.lock:
+            self.stats[counter] += amount
+
+    #  Metrics
+    #  ----------------------------------------------------------------
+
+    def collect(self):
+        with self.lock:
+            stats = dict(self.stats)
+
+        return [
+            '# HELP fyyur_jobs_total Background jobs by outcome.',
+            '# TYPE fyyur_jobs_total counter',
+        ] + [
+            f'fyyur_jobs_total{{outcome="{outcome}"}} {stats[outcome]}' for outcome in ('enqueued', 'succeeded', 'retried', 'failed')
+        ] + [
+            '# HELP fyyur_jobs_seconds_total Time spent running background jobs.',
+            '# TYPE fyyur_jobs_seconds_total counter',
+            f"fyyur_jobs_seconds_total {stats['run_time']}",
+            '# HELP fyyur_jobs_queued Jobs waiting to run.',
+            '# TYPE fyyur_jobs_queued gauge',
+            f'fyyur_jobs_queued {self.backend.depth()}',
+        ]
@@ -0,0 +1,172 @@
+import importlib.util
+import zlib
+from fnmatch import fnmatch
+
+from flask import current_app, request, session
+
+#----------------------------------------------------------------------------#
+# Compression.
+#----------------------------------------------------------------------------#
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'image/svg+xml',
+)
+
+
+class GzipStream(object):
+
+    def __init__(self, level):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, chunk):
+        #sync flush so every chunk of a streamed response reaches the client right away
+        return self.compressor.compress(chunk) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class BrotliStream(object):
+
+    def __init__(self, quality):
+        import brotli
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk):
+        return self.compressor.process(chunk) + self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+def brotli_available():
+    return importlib.util.find_spec('brotli') is not None
+
+
+def weak_etag(value):
+    #the compressed body is no longer byte-identical to what the ETag was computed over
+    return value if value.startswith('W/') else f'W/{value}'
+
+
+class CompressionMiddleware(object):
+    #WSGI middleware compressing response bodies chunk by chunk, streamed responses included
+
+    def __init__(self, wsgi_app, min_size=500, gzip_level=6, brotli_quality=4):
+        self.wsgi_app = wsgi_app
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.brotli = brotli_available()
+
+    def choose_encoding(self, environ):
+        accepted = environ.get('HTTP_ACCEPT_ENCODING', '')
+        codings = {coding.split(';')[0].strip() for coding in accepted.split(',')}
+        if self.brotli and 'br' in codings:
+            return 'br'
+        if 'gzip' in codings:
+            return 'gzip'
+        return None
+
+    def should_compress(self, environ, status, headers):
+        names = {name.lower(): value for name, value in headers}
+        if environ.get('REQUEST_METHOD') == 'HEAD' or not status.startswith('200'):
+            return False
+        if 'content-encoding' in names:
+            return False
+        if not names.get('content-type', '').startswith(COMPRESSIBLE_TYPES):
+            return False
+        length = names.get('content-length')
+        return length is None or int(length) >= self.min_size
+
+    def __call__(self, environ, start_response):
+        encoding = self.choose_encoding(environ)
+        if encoding is None:
+            return self.wsgi_app(environ, start_response)
+
+        state = {'stream': None}
+
+        def compressing_start_response(status, headers, exc_info=None):
+            if self.should_compress(environ, status, headers):
+                state['stream'] = BrotliStream(self.brotli_quality) if encoding == 'br' else GzipStream(self.gzip_level)
+                headers = [
+                    (name, weak_etag(value) if name.lower() == 'etag' else value)
+                    for name, value in headers if name.lower() != 'content-length'
+                ]
+                headers.append(('Content-Encoding', encoding))
+                vary = [value for name, value in headers if name.lower() == 'vary']
+                if not any('accept-encoding' in value.lower() for value in vary):
+                    headers.append(('Vary', 'Accept-Encoding'))
+            return start_response(status, headers, exc_info)
+
+        body = self.wsgi_app(environ, compressing_start_response)
+        return self.compress_body(body, state)
+
+    def compress_body(self, body, state):
+        try:
+            for chunk in body:
+                stream = state['stream']
+                if stream is None:
+                    yield chunk
+                elif chunk:
+                    yield stream.compress(chunk)
+            if state['stream'] is not None:
+                yield state['stream'].finish()
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+
+
+#----------------------------------------------------------------------------#
+# HTTP caching.
+#----------------------------------------------------------------------------#
+
+
+class CachePolicy(object):
+    #Cache-Control and Vary per endpoint from HTTP_CACHE_POLICIES, first matching pattern wins
+
+    def __init__(self, app=None):
+        self.policies = []
+        self.default = 'no-cache'
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.policies = app.config['HTTP_CACHE_POLICIES']
+        self.default = app.config['HTTP_CACHE_DEFAULT']
+        app.after_request(self.apply)
+        app.extensions['cache_policy'] = self
+
+    def policy_for(self, endpoint):
+        for pattern, cache_control, vary in self.policies:
+            if fnmatch(endpoint or '', pattern):
+                return cache_control, vary
+        return self.default, ()
+
+    def sets_cookie(self, response):
+        #after_request runs before the session is saved, so ask the session
+        #interface whether it is going to set the cookie (e.g. flashes consumed)
+        if 'Set-Cookie' in response.headers:
+            return True
+        return current_app.session_interface.should_set_cookie(current_app, session)
+
+    def apply(self, response):
+        if 'Cache-Control' in response.headers or request.method not in ('GET', 'HEAD'):
+            return response
+
+        #a response setting a cookie is per-user
+        if self.sets_cookie(response):
+            response.headers['Cache-Control'] = 'no-store'
+            return response
+        if response.status_code not in (200, 304):
+            response.headers['Cache-Control'] = self.default
+            return response
+
+        cache_control, vary = self.policy_for(request.endpoint)
+        response.headers['Cache-Control'] = cache_control
+        for header in vary:
+            response.vary.add(header)
+        return response
@@ -0,0 +1,54 @@
+"""add upcoming_shows feed table
+
+Revision ID: 1b7f4e2d9a06
+Revises: f3a6d1c0b5e9
+Create Date: 2026-10-18 18:05:42.190356
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b7f4e2d9a06'
+down_revision = 'f3a6d1c0b5e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('upcoming_shows',
+    sa.Column('show_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('start_time', sa.DateTime(), nullable=False),
+    sa.Column('city', sa.String(length=120), nullable=False),
+    sa.Column('state', sa.String(length=120), nullable=False),
+    sa.Column('venue_id', sa.Integer(), nullable=False),
+    sa.Column('venue_name', sa.String(), nullable=True),
+    sa.Column('artist_id', sa.Integer(), nullable=False),
+    sa.Column('artist_name', sa.String(), nullable=True),
+    sa.Column('artist_image_link', sa.String(length=500), nullable=True),
+    sa.Column('genres', sa.ARRAY(sa.String()), nullable=False),
+    sa.ForeignKeyConstraint(['show_id'], ['shows.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('show_id')
+    )
+    op.create_index('ix_upcoming_shows_city_state_start_time', 'upcoming_shows', ['city', 'state', 'start_time', 'show_id'], unique=False)
+    op.create_index('ix_upcoming_shows_start_time', 'upcoming_shows', ['start_time', 'show_id'], unique=False)
+    op.create_index('ix_upcoming_shows_genres', 'upcoming_shows', ['genres'], unique=False, postgresql_using='gin')
+    # backfill with the default 90 day horizon, `flask rollover-upcoming-shows --all` rebuilds with FEED_DAYS
+    op.execute("""
+        INSERT INTO upcoming_shows (show_id, day, start_time, city, state, venue_id, venue_name, artist_id, artist_name, artist_image_link, genres)
+        SELECT shows.id, shows.start_time::date, shows.start_time, coalesce(venues.city, ''), coalesce(venues.state, ''),
+               shows.venue_id, venues.name, shows.artist_id, artists.name, artists.image_link, coalesce(artists.genres, '{}'::varchar[])
+        FROM shows
+        JOIN venues ON venues.id = shows.venue_id
+        JOIN artists ON artists.id = shows.artist_id
+        WHERE shows.start_time > now() AND shows.start_time < now() + interval '90 days'
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_upcoming_shows_genres', table_name='upcoming_shows')
+    op.drop_index('ix_upcoming_shows_start_time', table_name='upcoming_shows')
+    op.drop_index('ix_upcoming_shows_city_state_start_time', table_name='upcoming_shows')
+    op.drop_table('upcoming_shows')
@@ -0,0 +1,34 @@
+"""add indexes for show lookups, area grouping and name search
+
+Revision ID: 4c1d7e2a9b3f
+Revises: 2b2efc44f88f
+Create Date: 2026-10-18 10:02:11.418273
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4c1d7e2a9b3f'
+down_revision = '2b2efc44f88f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_shows_venue_id_start_time', 'shows', ['venue_id', 'start_time'], unique=False)
+    op.create_index('ix_shows_artist_id_start_time', 'shows', ['artist_id', 'start_time'], unique=False)
+    op.create_index('ix_shows_start_time_id', 'shows', ['start_time', 'id'], unique=False)
+    op.create_index('ix_venues_state_city_id', 'venues', ['state', 'city', 'id'], unique=False)
+    op.create_index('ix_venues_name_trgm', 'venues', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_artists_name_trgm', 'artists', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade():
+    op.drop_index('ix_artists_name_trgm', table_name='artists')
+    op.drop_index('ix_venues_name_trgm', table_name='venues')
+    op.drop_index('ix_venues_state_city_id', table_name='venues')
+    op.drop_index('ix_shows_start_time_id', table_name='shows')
+    op.drop_index('ix_shows_artist_id_start_time', table_name='shows')
+    op.drop_index('ix_shows_venue_id_start_time', table_name='shows')
@@ -0,0 +1,60 @@
+"""add search_vector columns and triggers for full text search
+
+Revision ID: 7e3a5c19d0b2
+Revises: 4c1d7e2a9b3f
+Create Date: 2026-10-18 11:24:37.902114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '7e3a5c19d0b2'
+down_revision = '4c1d7e2a9b3f'
+branch_labels = None
+depends_on = None
+
+
+# name ranks above city/state, which rank above genres
+SEARCH_VECTOR_FUNCTION = """
+CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.city, '') || ' ' || coalesce(NEW.state, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(array_to_string(NEW.genres, ' '), '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+SEARCH_VECTOR_TRIGGER = """
+CREATE TRIGGER {table}_search_vector_update
+BEFORE INSERT OR UPDATE OF name, city, state, genres ON {table}
+FOR EACH ROW EXECUTE PROCEDURE {table}_search_vector_update()
+"""
+
+
+def upgrade():
+    for table in ('artists', 'venues'):
+        op.add_column(table, sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+        op.execute(SEARCH_VECTOR_FUNCTION.format(table=table))
+        op.execute(SEARCH_VECTOR_TRIGGER.format(table=table))
+        # fire the trigger once for existing rows
+        op.execute(f'UPDATE {table} SET name = name')
+        op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], unique=False, postgresql_using='gin')
+        # name search no longer uses ILIKE, the trigram index only costs writes now
+        op.drop_index(f'ix_{table}_name_trgm', table_name=table)
+    op.execute('DROP EXTENSION IF EXISTS pg_trgm')
+
+
+def downgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table in ('venues', 'artists'):
+        op.create_index(f'ix_{table}_name_trgm', table, ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_search_vector_update ON {table}')
+        op.execute(f'DROP FUNCTION IF EXISTS {table}_search_vector_update()')
+        op.drop_column(table, 'search_vector')
@@ -0,0 +1,29 @@
+"""make venue city and state not null for the area seek
+
+Revision ID: 8f4b2a6c3d15
+Revises: 5d2c8f1e7a43
+Create Date: 2026-10-18 21:05:41.118230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f4b2a6c3d15'
+down_revision = '5d2c8f1e7a43'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # a NULL in the (state, city, id) row value never compares greater, the /venues pager would stop there
+    op.execute("UPDATE venues SET city = '' WHERE city IS NULL")
+    op.execute("UPDATE venues SET state = '' WHERE state IS NULL")
+    op.alter_column('venues', 'city', existing_type=sa.String(length=120), nullable=False)
+    op.alter_column('venues', 'state', existing_type=sa.String(length=120), nullable=False)
+
+
+def downgrade():
+    op.alter_column('venues', 'state', existing_type=sa.String(length=120), nullable=True)
+    op.alter_column('venues', 'city', existing_type=sa.String(length=120), nullable=True)
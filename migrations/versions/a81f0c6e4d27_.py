@@ -0,0 +1,26 @@
+"""add updated_at columns for API validators
+
+Revision ID: a81f0c6e4d27
+Revises: 7e3a5c19d0b2
+Create Date: 2026-10-18 13:05:52.661730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a81f0c6e4d27'
+down_revision = '7e3a5c19d0b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('artists', 'venues', 'shows'):
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), server_default=sa.text("timezone('utc', now())"), nullable=False))
+
+
+def downgrade():
+    for table in ('shows', 'venues', 'artists'):
+        op.drop_column(table, 'updated_at')
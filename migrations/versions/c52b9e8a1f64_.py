@@ -0,0 +1,33 @@
+"""add denormalized upcoming/past show counters
+
+Revision ID: c52b9e8a1f64
+Revises: a81f0c6e4d27
+Create Date: 2026-10-18 14:31:09.284516
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c52b9e8a1f64'
+down_revision = 'a81f0c6e4d27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table, key in (('venues', 'venue_id'), ('artists', 'artist_id')):
+        op.add_column(table, sa.Column('upcoming_shows_count', sa.Integer(), server_default='0', nullable=False))
+        op.add_column(table, sa.Column('past_shows_count', sa.Integer(), server_default='0', nullable=False))
+        op.execute(f'''
+            UPDATE {table} SET
+                upcoming_shows_count = (SELECT count(*) FROM shows WHERE shows.{key} = {table}.id AND shows.start_time > now()),
+                past_shows_count = (SELECT count(*) FROM shows WHERE shows.{key} = {table}.id AND shows.start_time <= now())
+        ''')
+
+
+def downgrade():
+    for table in ('artists', 'venues'):
+        op.drop_column(table, 'past_shows_count')
+        op.drop_column(table, 'upcoming_shows_count')
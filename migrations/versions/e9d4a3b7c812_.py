@@ -0,0 +1,32 @@
+"""add show end_time and GiST period indexes for booking conflicts
+
+Revision ID: e9d4a3b7c812
+Revises: c52b9e8a1f64
+Create Date: 2026-10-18 15:48:22.107395
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9d4a3b7c812'
+down_revision = 'c52b9e8a1f64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # btree_gist lets the integer id share a GiST index with the period
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.add_column('shows', sa.Column('end_time', sa.DateTime(), nullable=True))
+    op.execute("UPDATE shows SET end_time = start_time + interval '180 minutes'")
+    op.alter_column('shows', 'end_time', nullable=False)
+    op.execute('CREATE INDEX ix_shows_venue_id_period ON shows USING gist (venue_id, tsrange(start_time, end_time))')
+    op.execute('CREATE INDEX ix_shows_artist_id_period ON shows USING gist (artist_id, tsrange(start_time, end_time))')
+
+
+def downgrade():
+    op.drop_index('ix_shows_artist_id_period', table_name='shows')
+    op.drop_index('ix_shows_venue_id_period', table_name='shows')
+    op.drop_column('shows', 'end_time')
@@ -0,0 +1,45 @@
+"""add genre GIN indexes and genre_facets table
+
+Revision ID: f3a6d1c0b5e9
+Revises: e9d4a3b7c812
+Create Date: 2026-10-18 16:40:13.551802
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a6d1c0b5e9'
+down_revision = 'e9d4a3b7c812'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_artists_genres', 'artists', ['genres'], unique=False, postgresql_using='gin')
+    op.create_index('ix_venues_genres', 'venues', ['genres'], unique=False, postgresql_using='gin')
+    op.create_table('genre_facets',
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('genre', sa.String(length=120), nullable=False),
+    sa.Column('city', sa.String(length=120), nullable=False),
+    sa.Column('state', sa.String(length=120), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('kind', 'genre', 'city', 'state')
+    )
+    for table in ('artists', 'venues'):
+        op.execute(f"""
+            INSERT INTO genre_facets (kind, genre, city, state, count)
+            SELECT '{table}', genre, city, state, count(*)
+            FROM (
+                SELECT DISTINCT id, unnest(genres) AS genre, coalesce(city, '') AS city, coalesce(state, '') AS state
+                FROM {table}
+            ) AS tagged
+            GROUP BY genre, city, state
+        """)
+
+
+def downgrade():
+    op.drop_table('genre_facets')
+    op.drop_index('ix_venues_genres', table_name='venues')
+    op.drop_index('ix_artists_genres', table_name='artists')
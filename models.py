@@ -1,5 +1,13 @@
-from datetime import datetime
-from app import db
+from datetime import datetime, time, timedelta
+from collections import Counter
+from itertools import groupby
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR, insert
+from sqlalchemy.orm import Session
+from extensions import db
+from pagination import paginate
+from search import search
 
 
 # TODO: connect to a local postgresql database
@@ -11,20 +19,33 @@ from app import db
 
 class Venue(db.Model):
      __tablename__ = 'venues'
+     __table_args__ = (
+          db.Index('ix_venues_state_city_id', 'state', 'city', 'id'),
+          db.Index('ix_venues_search_vector', 'search_vector', postgresql_using='gin'),
+          db.Index('ix_venues_genres', 'genres', postgresql_using='gin'),
+     )
 
      id = db.Column(db.Integer, primary_key=True)
      name = db.Column(db.String)
-     city = db.Column(db.String(120))
-     state = db.Column(db.String(120))
+     # part of the /venues seek key, a NULL would end the pager there
+     city = db.Column(db.String(120), nullable=False)
+     state = db.Column(db.String(120), nullable=False)
      address = db.Column(db.String(120))
      phone = db.Column(db.String(120))
-     genres = db.Column('genres', db.ARRAY(db.String(120)), nullable=False)
+     genres = db.Column('genres', ARRAY(db.String(120)), nullable=False)
      facebook_link = db.Column(db.String(120))
      image_link = db.Column(db.String(500))
      website_link = db.Column(db.String(120))
      seeking_talent = db.Column(db.Boolean, default=True)
      seeking_description = db.Column(db.String(250))
-     shows = db.relationship('Show', backref='venues', lazy=True)
+     # maintained by count_new_show() and refresh_show_counts()
+     upcoming_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+     past_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, server_default=db.text("timezone('utc', now())"))
+     # maintained by the venues_search_vector_update trigger
+     search_vector = db.deferred(db.Column(TSVECTOR))
+     # a show is never displayed without its venue, so load it in the same query
+     shows = db.relationship('Show', backref=db.backref('venues', lazy='joined'), lazy=True)
 
      def __repr__(self):
           return f'Venue {self.id} name: {self.name}'
@@ -34,31 +55,628 @@ class Venue(db.Model):
 
 class Artist(db.Model):
      __tablename__ = 'artists'
+     __table_args__ = (
+          db.Index('ix_artists_search_vector', 'search_vector', postgresql_using='gin'),
+          db.Index('ix_artists_genres', 'genres', postgresql_using='gin'),
+     )
 
      id = db.Column(db.Integer, primary_key=True)
      name = db.Column(db.String)
      city = db.Column(db.String(120))
      state = db.Column(db.String(120))
      phone = db.Column(db.String(120))
-     genres = db.Column('genres', db.ARRAY(db.String()))
+     genres = db.Column('genres', ARRAY(db.String()))
      facebook_link = db.Column(db.String(120))
      image_link = db.Column(db.String(500))
      website_link = db.Column(db.String(120))
      seeking_venue = db.Column(db.Boolean, default=True)
      seeking_description = db.Column(db.String(120))
-     shows = db.relationship('Show', backref='artists', lazy=True)
+     # maintained by count_new_show() and refresh_show_counts()
+     upcoming_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+     past_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, server_default=db.text("timezone('utc', now())"))
+     # maintained by the artists_search_vector_update trigger
+     search_vector = db.deferred(db.Column(TSVECTOR))
+     shows = db.relationship('Show', backref=db.backref('artists', lazy='joined'), lazy=True)
 
      def __repr__(self):
           return f'Artist {self.id} name: {self.name}'
 
 
+def show_duration():
+     return timedelta(minutes=current_app.config['SHOW_DURATION_MINUTES'])
+
+
+def default_end_time(context):
+     #shows are booked for the configured duration unless an end time is given
+     start_time = context.get_current_parameters().get('start_time') or datetime.utcnow()
+     return start_time + show_duration()
+
+
 class Show(db.Model):
      __tablename__ = 'shows'
+     __table_args__ = (
+          db.Index('ix_shows_venue_id_start_time', 'venue_id', 'start_time'),
+          db.Index('ix_shows_artist_id_start_time', 'artist_id', 'start_time'),
+          db.Index('ix_shows_start_time_id', 'start_time', 'id'),
+     )
 
      id = db.Column(db.Integer, primary_key=True)
      artist_id = db.Column(db.Integer, db.ForeignKey('artists.id'), nullable=False)
      venue_id = db.Column(db.Integer, db.ForeignKey('venues.id'), nullable=False)
      start_time = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+     end_time = db.Column(db.DateTime, nullable=False, default=default_end_time)
+     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, server_default=db.text("timezone('utc', now())"))
+
+     def __repr__(self):
+          return f'<Show: {self.id}, Artist: {self.artist_id}, Venue: {self.venue_id}>'
+
+
+class GenreFacet(db.Model):
+     # artist/venue counts per genre and area, kept current by track_genre_facets()
+     __tablename__ = 'genre_facets'
+
+     kind = db.Column(db.String(20), primary_key=True)
+     genre = db.Column(db.String(120), primary_key=True)
+     city = db.Column(db.String(120), primary_key=True)
+     state = db.Column(db.String(120), primary_key=True)
+     count = db.Column(db.Integer, nullable=False, default=0)
+
+     def __repr__(self):
+          return f'<GenreFacet: {self.kind} {self.genre} {self.city}, {self.state}: {self.count}>'
+
+
+class UpcomingShow(db.Model):
+     # shows starting in the next FEED_DAYS, denormalized for the feed; kept current by track_upcoming_shows()
+     __tablename__ = 'upcoming_shows'
+     __table_args__ = (
+          db.Index('ix_upcoming_shows_city_state_start_time', 'city', 'state', 'start_time', 'show_id'),
+          db.Index('ix_upcoming_shows_start_time', 'start_time', 'show_id'),
+          db.Index('ix_upcoming_shows_genres', 'genres', postgresql_using='gin'),
+     )
+
+     show_id = db.Column(db.Integer, db.ForeignKey('shows.id', ondelete='CASCADE'), primary_key=True)
+     day = db.Column(db.Date, nullable=False)
+     start_time = db.Column(db.DateTime, nullable=False)
+     city = db.Column(db.String(120), nullable=False)
+     state = db.Column(db.String(120), nullable=False)
+     venue_id = db.Column(db.Integer, nullable=False)
+     venue_name = db.Column(db.String)
+     artist_id = db.Column(db.Integer, nullable=False)
+     artist_name = db.Column(db.String)
+     artist_image_link = db.Column(db.String(500))
+     genres = db.Column(ARRAY(db.String()), nullable=False)
+
+     def __repr__(self):
+          return f'<UpcomingShow: {self.show_id} {self.day} {self.city}, {self.state}>'
+
+
+class Job(db.Model):
+     # queued background jobs for JOBS_BACKEND = 'database', see jobs.py
+     __tablename__ = 'jobs'
+     __table_args__ = (
+          db.Index('ix_jobs_status_run_at', 'status', 'run_at'),
+     )
+
+     id = db.Column(db.Integer, primary_key=True)
+     name = db.Column(db.String(120), nullable=False)
+     args = db.Column(JSONB, nullable=False, server_default=db.text("'{}'::jsonb"))
+     status = db.Column(db.String(20), nullable=False, server_default='queued')
+     attempts = db.Column(db.Integer, nullable=False, server_default='0')
+     run_at = db.Column(db.DateTime, nullable=False, server_default=db.text("timezone('utc', now())"))
+     locked_at = db.Column(db.DateTime)
+     last_error = db.Column(db.Text)
 
      def __repr__(self):
-          return f'<Show: {self.id}, Artist: {self.artist_id}, Venue: {self.venue_id}>'
\ No newline at end of file
+          return f'<Job: {self.id} {self.name} {self.status}>'
+
+
+# GiST indexes over the booked period, used by booking_conflicts() and the availability queries
+db.Index('ix_shows_venue_id_period', Show.venue_id, db.func.tsrange(Show.start_time, Show.end_time), postgresql_using='gist')
+db.Index('ix_shows_artist_id_period', Show.artist_id, db.func.tsrange(Show.start_time, Show.end_time), postgresql_using='gist')
+
+
+#----------------------------------------------------------------------------#
+# Queries.
+#----------------------------------------------------------------------------#
+
+# Shared by the HTML views and the JSON API, each returns template ready data
+
+
+def partition_shows(shows, now=None):
+     #Split start-time ordered shows into (upcoming, past); a show starting exactly now is past
+     now = now or datetime.now()
+     upcoming_shows = []
+     past_shows = []
+
+     for show in shows:
+          if show['start_time'] > now:
+               upcoming_shows.append(show)
+          else:
+               past_shows.append(show)
+
+     return upcoming_shows, past_shows
+
+
+def venues_with_upcoming_counts(*columns):
+     return db.session.query(Venue.id, Venue.name, *columns, Venue.upcoming_shows_count.label('num_upcoming_shows'))
+
+
+def artists_with_upcoming_counts(*columns):
+     return db.session.query(Artist.id, Artist.name, *columns, Artist.upcoming_shows_count.label('num_upcoming_shows'))
+
+
+def venue_areas(cursor=None, genre=None):
+     #One page of venues with their upcoming show counts, ordered by area
+     venues_query = venues_with_upcoming_counts(Venue.city, Venue.state)
+     if genre:
+          venues_query = venues_query.filter(Venue.genres.contains([genre]))
+
+     venues_data, next_cursor = paginate(venues_query, [Venue.state, Venue.city, Venue.id], cursor)
+     data = []
+
+     for (city, state), area_venues in groupby(venues_data, key=lambda venue: (venue.city, venue.state)):
+          data.append({
+               'city': city,
+               'state': state,
+               'venues': [{
+                    'id': venue.id,
+                    'name': venue.name,
+                    'num_upcoming_shows': venue.num_upcoming_shows
+               } for venue in area_venues]
+          })
+
+     return data, next_cursor
+
+
+def artist_list(cursor=None, genre=None):
+     #One page of artists, seeking past the cursor on id
+     artists_query = db.session.query(Artist.id, Artist.name)
+     if genre:
+          artists_query = artists_query.filter(Artist.genres.contains([genre]))
+
+     artists, next_cursor = paginate(artists_query, [Artist.id], cursor)
+     return [{'id': artist.id, 'name': artist.name} for artist in artists], next_cursor
+
+
+def show_list(cursor=None):
+     #One page of shows in start time order, artist and venue columns fetched in the same query
+     shows_query = db.session.query(
+          Show.id,
+          Show.start_time,
+          Show.venue_id,
+          Venue.name.label('venue_name'),
+          Show.artist_id,
+          Artist.name.label('artist_name'),
+          Artist.image_link.label('artist_image_link')
+     ).join(Artist, Show.artist_id == Artist.id).join(Venue, Show.venue_id == Venue.id)
+
+     shows, next_cursor = paginate(shows_query, [Show.start_time, Show.id], cursor)
+     data = []
+
+     for show in shows:
+          data.append({
+               'venue_id': show.venue_id,
+               'venue_name': show.venue_name,
+               'artist_id': show.artist_id,
+               'artist_name': show.artist_name,
+               'artist_image_link': show.artist_image_link,
+               'start_time': show.start_time
+          })
+
+     return data, next_cursor
+
+
+def search_results(query, model, term):
+     #Ranked full text matches with their upcoming show counts
+     matches = search(query, model, term)
+     return {
+          'count': len(matches),
+          'data': [{
+               'id': match.id,
+               'name': match.name,
+               'num_upcoming_shows': match.num_upcoming_shows
+          } for match in matches]
+     }
+
+
+def venue_shows(venue_id):
+     return db.session.query(
+          Show.artist_id,
+          Artist.name.label('artist_name'),
+          Artist.image_link.label('artist_image_link'),
+          Show.start_time
+     ).join(Artist, Show.artist_id == Artist.id).filter(Show.venue_id == venue_id).order_by(Show.start_time)
+
+
+def venue_page(venue, shows_data):
+     #Split the start-time ordered shows into upcoming and past in a single pass
+     upcoming_shows, past_shows = partition_shows([{
+          'artist_id': show.artist_id,
+          'artist_name': show.artist_name,
+          'artist_image_link': show.artist_image_link,
+          'start_time': show.start_time
+     } for show in shows_data])
+
+     return {
+          'id': venue.id,
+          'name': venue.name,
+          'genres': venue.genres,
+          'address': venue.address,
+          'city': venue.city,
+          'state': venue.state,
+          'phone': venue.phone,
+          'image_link': venue.image_link,
+          'facebook_link': venue.facebook_link,
+          'website_link': venue.website_link,
+          'seeking_talent': True,
+          'seeking_description': venue.seeking_description,
+          'past_shows': past_shows,
+          'upcoming_shows': upcoming_shows,
+          'past_shows_count': len(past_shows),
+          'upcoming_shows_count': len(upcoming_shows),
+     }
+
+
+def venue_details(venue_id):
+     venue = Venue.query.get(venue_id)
+     if venue is None:
+          return None
+     return venue_page(venue, venue_shows(venue_id).all())
+
+
+def artist_shows(artist_id):
+     return db.session.query(
+          Show.venue_id,
+          Venue.name.label('venue_name'),
+          Venue.image_link.label('venue_image_link'),
+          Show.start_time
+     ).join(Venue, Show.venue_id == Venue.id).filter(Show.artist_id == artist_id).order_by(Show.start_time)
+
+
+def artist_page(artist, shows_data):
+     #Split the start-time ordered shows into upcoming and past in a single pass
+     upcoming_shows, past_shows = partition_shows([{
+          'venue_id': show.venue_id,
+          'venue_name': show.venue_name,
+          'venue_image_link': show.venue_image_link,
+          'start_time': show.start_time
+     } for show in shows_data])
+
+     return {
+          'id': artist.id,
+          'name': artist.name,
+          'genres': artist.genres,
+          'city': artist.city,
+          'state': artist.state,
+          'phone': artist.phone,
+          'image_link': artist.image_link,
+          'facebook_link': artist.facebook_link,
+          'website_link': artist.website_link,
+          'seeking_venue': True,
+          'seeking_description': artist.seeking_description,
+          'past_shows': past_shows,
+          'upcoming_shows': upcoming_shows,
+          'past_shows_count': len(past_shows),
+          'upcoming_shows_count': len(upcoming_shows),
+     }
+
+
+def artist_details(artist_id):
+     artist = Artist.query.get(artist_id)
+     if artist is None:
+          return None
+     return artist_page(artist, artist_shows(artist_id).all())
+
+
+def venue_version(venue_id):
+     #Everything a venue page depends on, in one aggregate row: None if the venue does not exist
+     return db.session.query(
+          Venue.updated_at,
+          db.func.max(Show.updated_at),
+          db.func.max(Artist.updated_at),
+          db.func.count(Show.id),
+          db.func.count(Show.id).filter(Show.start_time > datetime.now())
+     ).outerjoin(
+          Show, Show.venue_id == Venue.id
+     ).outerjoin(
+          Artist, Show.artist_id == Artist.id
+     ).filter(Venue.id == venue_id).group_by(Venue.id).first()
+
+
+def artist_version(artist_id):
+     #Everything an artist page depends on, in one aggregate row: None if the artist does not exist
+     return db.session.query(
+          Artist.updated_at,
+          db.func.max(Show.updated_at),
+          db.func.max(Venue.updated_at),
+          db.func.count(Show.id),
+          db.func.count(Show.id).filter(Show.start_time > datetime.now())
+     ).outerjoin(
+          Show, Show.artist_id == Artist.id
+     ).outerjoin(
+          Venue, Show.venue_id == Venue.id
+     ).filter(Artist.id == artist_id).group_by(Artist.id).first()
+
+
+#----------------------------------------------------------------------------#
+# Show counters.
+#----------------------------------------------------------------------------#
+
+
+def count_new_show(show, now=None):
+     #Bump the venue and artist counters in the caller's transaction
+     now = now or datetime.now()
+     counter = 'upcoming_shows_count' if show.start_time > now else 'past_shows_count'
+
+     for model, model_id in ((Venue, show.venue_id), (Artist, show.artist_id)):
+          column = getattr(model, counter)
+          #counters are derived, leave updated_at to real edits
+          db.session.query(model).filter(model.id == model_id).update(
+               {column: column + 1, model.updated_at: model.updated_at}, synchronize_session=False
+          )
+
+
+def refresh_show_counts(venue_ids=None, artist_ids=None, now=None):
+     #Recount from the shows table, ids may be a collection or a subquery, None means every row
+     now = now or datetime.now()
+
+     for model, key, ids in ((Venue, Show.venue_id, venue_ids), (Artist, Show.artist_id, artist_ids)):
+          upcoming = db.session.query(db.func.count(Show.id)).filter(key == model.id, Show.start_time > now).correlate(model).as_scalar()
+          past = db.session.query(db.func.count(Show.id)).filter(key == model.id, Show.start_time <= now).correlate(model).as_scalar()
+
+          query = db.session.query(model)
+          if ids is not None:
+               query = query.filter(model.id.in_(ids))
+          query.update(
+               {model.upcoming_shows_count: upcoming, model.past_shows_count: past, model.updated_at: model.updated_at}, synchronize_session=False
+          )
+
+
+def roll_over_show_counts(window, now=None):
+     #Move shows that started within the last `window` from upcoming to past, safe to re-run
+     now = now or datetime.now()
+     started = db.session.query(Show).filter(Show.start_time > now - window, Show.start_time <= now)
+
+     refresh_show_counts(
+          venue_ids=started.with_entities(Show.venue_id).distinct().subquery(),
+          artist_ids=started.with_entities(Show.artist_id).distinct().subquery(),
+          now=now
+     )
+
+
+#----------------------------------------------------------------------------#
+# Bookings.
+#----------------------------------------------------------------------------#
+
+
+def overlaps(start_time, end_time):
+     #Same tsrange expression as the GiST indexes, so the planner can use them
+     return db.func.tsrange(Show.start_time, Show.end_time).op('&&')(db.func.tsrange(start_time, end_time))
+
+
+def booking_conflicts(venue_id, artist_id, start_time, end_time):
+     #Lock the venue and artist rows first so two concurrent bookings cannot both pass the check
+     db.session.query(Venue.id).filter(Venue.id == venue_id).with_for_update().all()
+     db.session.query(Artist.id).filter(Artist.id == artist_id).with_for_update().all()
+
+     return db.session.query(Show.id, Show.venue_id, Show.artist_id, Show.start_time, Show.end_time).filter(
+          db.or_(Show.venue_id == venue_id, Show.artist_id == artist_id), overlaps(start_time, end_time)
+     ).all()
+
+
+def available_venues(city, state, start_time, end_time, limit=50):
+     #Venues in the area with no show overlapping [start_time, end_time)
+     booked = db.session.query(Show.id).filter(Show.venue_id == Venue.id, overlaps(start_time, end_time)).exists()
+     return db.session.query(Venue.id, Venue.name, Venue.city, Venue.state).filter(
+          Venue.city == city, Venue.state == state, ~booked
+     ).order_by(Venue.name, Venue.id).limit(limit).all()
+
+
+def available_artists(city, state, start_time, end_time, limit=50):
+     #Artists in the area with no show overlapping [start_time, end_time)
+     booked = db.session.query(Show.id).filter(Show.artist_id == Artist.id, overlaps(start_time, end_time)).exists()
+     return db.session.query(Artist.id, Artist.name, Artist.city, Artist.state).filter(
+          Artist.city == city, Artist.state == state, ~booked
+     ).order_by(Artist.name, Artist.id).limit(limit).all()
+
+
+#----------------------------------------------------------------------------#
+# Genre facets.
+#----------------------------------------------------------------------------#
+
+
+def facet_keys(kind, genres, city, state):
+     return [(kind, genre, city or '', state or '') for genre in set(genres or [])]
+
+
+def previous_value(instance, attribute):
+     #Value as loaded from the database, before this flush changed it
+     history = inspect(instance).attrs[attribute].history
+     if history.deleted:
+          return history.deleted[0]
+     if history.unchanged:
+          return history.unchanged[0]
+     return getattr(instance, attribute)
+
+
+@event.listens_for(Session, 'after_flush')
+def track_genre_facets(session, flush_context):
+     #Apply +1/-1 facet deltas for every artist/venue written in this flush, in the same transaction
+     deltas = Counter()
+
+     for instance in session.new:
+          if isinstance(instance, (Artist, Venue)):
+               deltas.update(facet_keys(instance.__tablename__, instance.genres, instance.city, instance.state))
+
+     for instance in session.deleted:
+          if isinstance(instance, (Artist, Venue)):
+               deltas.subtract(facet_keys(
+                    instance.__tablename__, previous_value(instance, 'genres'), previous_value(instance, 'city'), previous_value(instance, 'state')
+               ))
+
+     for instance in session.dirty:
+          if isinstance(instance, (Artist, Venue)) and session.is_modified(instance):
+               deltas.subtract(facet_keys(
+                    instance.__tablename__, previous_value(instance, 'genres'), previous_value(instance, 'city'), previous_value(instance, 'state')
+               ))
+               deltas.update(facet_keys(instance.__tablename__, instance.genres, instance.city, instance.state))
+
+     rows = [
+          {'kind': kind, 'genre': genre, 'city': city, 'state': state, 'count': delta}
+          for (kind, genre, city, state), delta in deltas.items() if delta
+     ]
+     if rows:
+          statement = insert(GenreFacet.__table__).values(rows)
+          session.execute(statement.on_conflict_do_update(
+               index_elements=['kind', 'genre', 'city', 'state'],
+               set_={'count': GenreFacet.__table__.c.count + statement.excluded.count}
+          ))
+
+
+def refresh_genre_facets():
+     #Rebuild every facet count, for writes that bypass the ORM such as bulk imports
+     db.session.query(GenreFacet).delete(synchronize_session=False)
+     for table in ('artists', 'venues'):
+          db.session.execute(db.text(f"""
+               INSERT INTO genre_facets (kind, genre, city, state, count)
+               SELECT '{table}', genre, city, state, count(*)
+               FROM (
+                    SELECT DISTINCT id, unnest(genres) AS genre, coalesce(city, '') AS city, coalesce(state, '') AS state
+                    FROM {table}
+               ) AS tagged
+               GROUP BY genre, city, state
+          """))
+
+
+def genre_facets(kind, city=None, state=None):
+     #Genre counts for artists or venues, optionally within one city
+     query = db.session.query(
+          GenreFacet.genre, db.func.sum(GenreFacet.count).label('count')
+     ).filter(GenreFacet.kind == kind, GenreFacet.count > 0)
+
+     if city is not None:
+          query = query.filter(GenreFacet.city == city, GenreFacet.state == (state or ''))
+
+     return query.group_by(GenreFacet.genre).order_by(db.desc('count'), GenreFacet.genre).all()
+
+
+#----------------------------------------------------------------------------#
+# Upcoming shows feed.
+#----------------------------------------------------------------------------#
+
+
+def feed_horizon():
+     return timedelta(days=current_app.config['FEED_DAYS'])
+
+
+def upcoming_show_source(start, end):
+     #Feed rows for shows starting in [start, end), as a SELECT for INSERT ... FROM SELECT
+     return db.session.query(
+          Show.id,
+          db.cast(Show.start_time, db.Date),
+          Show.start_time,
+          db.func.coalesce(Venue.city, ''),
+          db.func.coalesce(Venue.state, ''),
+          Show.venue_id,
+          Venue.name,
+          Show.artist_id,
+          Artist.name,
+          Artist.image_link,
+          db.func.coalesce(Artist.genres, db.literal_column("'{}'::varchar[]"))
+     ).join(Venue, Show.venue_id == Venue.id).join(Artist, Show.artist_id == Artist.id).filter(
+          Show.start_time > start, Show.start_time < end
+     )
+
+
+UPCOMING_SHOW_COLUMNS = [
+     'show_id', 'day', 'start_time', 'city', 'state', 'venue_id', 'venue_name', 'artist_id', 'artist_name', 'artist_image_link', 'genres'
+]
+
+
+def refresh_upcoming_shows(session=None, show_ids=None, venue_ids=None, artist_ids=None, now=None):
+     #Re-derive the feed rows of the given shows, venues and artists (all rows when none given) in the caller's transaction
+     session = session or db.session
+     now = now or datetime.now()
+     table = UpcomingShow.__table__
+     delete = table.delete()
+     source = upcoming_show_source(now, now + feed_horizon())
+
+     conditions = [
+          (table.c.show_id, Show.id, show_ids),
+          (table.c.venue_id, Show.venue_id, venue_ids),
+          (table.c.artist_id, Show.artist_id, artist_ids),
+     ]
+     conditions = [(feed_column, show_column, ids) for feed_column, show_column, ids in conditions if ids is not None]
+     if conditions:
+          delete = delete.where(db.or_(*[feed_column.in_(ids) for feed_column, _, ids in conditions]))
+          source = source.filter(db.or_(*[show_column.in_(ids) for _, show_column, ids in conditions]))
+
+     session.execute(delete)
+     session.execute(table.insert().from_select(UPCOMING_SHOW_COLUMNS, source.statement))
+
+
+def roll_forward_upcoming_shows(window, now=None):
+     #Drop started shows and add the ones that entered the horizon within the last `window`, safe to re-run
+     now = now or datetime.now()
+     horizon = now + feed_horizon()
+     table = UpcomingShow.__table__
+
+     db.session.execute(table.delete().where(table.c.start_time <= now))
+     db.session.execute(
+          insert(table).from_select(UPCOMING_SHOW_COLUMNS, upcoming_show_source(max(now, horizon - window), horizon).statement)
+          .on_conflict_do_nothing(index_elements=['show_id'])
+     )
+
+
+@event.listens_for(Session, 'after_flush')
+def track_upcoming_shows(session, flush_context):
+     #Feed rows of new or edited shows are written in the same transaction;
+     #venue and artist edits are copied over by a background job (tasks.py)
+     show_ids = {instance.id for instance in list(session.new) + list(session.dirty) if isinstance(instance, Show)}
+     if show_ids:
+          refresh_upcoming_shows(session, show_ids=show_ids)
+
+
+def feed_range(when, today=None):
+     #(first day, last day) for the ?when= shortcuts
+     today = today or datetime.now().date()
+     if when == 'today':
+          return today, today
+     if when == 'weekend':
+          #Saturday and Sunday, or what is left of them
+          saturday = today - timedelta(days=1) if today.weekday() == 6 else today + timedelta(days=5 - today.weekday())
+          return max(today, saturday), saturday + timedelta(days=1)
+     if when == 'week':
+          return today, today + timedelta(days=6)
+     return None, None
+
+
+def upcoming_feed(city=None, state=None, first_day=None, last_day=None, genre=None, cursor=None, size=None):
+     #One page of upcoming shows from the summary table, a single range scan on the city or start time index
+     start = datetime.now()
+     if first_day is not None:
+          start = max(start, datetime.combine(first_day, time.min))
+
+     query = db.session.query(
+          UpcomingShow.show_id,
+          UpcomingShow.day,
+          UpcomingShow.start_time,
+          UpcomingShow.city,
+          UpcomingShow.state,
+          UpcomingShow.venue_id,
+          UpcomingShow.venue_name,
+          UpcomingShow.artist_id,
+          UpcomingShow.artist_name,
+          UpcomingShow.artist_image_link
+     ).filter(UpcomingShow.start_time > start)
+
+     if city is not None:
+          query = query.filter(UpcomingShow.city == city, UpcomingShow.state == (state or ''))
+     if last_day is not None:
+          query = query.filter(UpcomingShow.start_time < datetime.combine(last_day + timedelta(days=1), time.min))
+     if genre:
+          query = query.filter(UpcomingShow.genres.contains([genre]))
+
+     shows, next_cursor = paginate(query, [UpcomingShow.start_time, UpcomingShow.show_id], cursor, size)
+     return [show._asdict() for show in shows], next_cursor
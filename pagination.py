@@ -0,0 +1,60 @@
+import base64
+import json
+from datetime import datetime
+
+from flask import abort, current_app, has_request_context, request
+from sqlalchemy import tuple_
+
+#----------------------------------------------------------------------------#
+# Keyset pagination.
+#----------------------------------------------------------------------------#
+
+
+def encode_cursor(values):
+    payload = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_value(column, value):
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if isinstance(value, bool) or not isinstance(value, python_type):
+        raise TypeError(value)
+    return value
+
+
+def decode_cursor(cursor, columns):
+    #Cursors come from the query string, anything but a list of values we could have encoded is a 400
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        return [decode_value(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError):
+        abort(400)
+
+
+def page_size():
+    #page size from ?limit=, bounded by the configured maximum; PAGE_SIZE outside a request (CLI, jobs)
+    if not has_request_context():
+        return current_app.config['PAGE_SIZE']
+    size = request.args.get('limit', current_app.config['PAGE_SIZE'], type=int)
+    return max(1, min(size, current_app.config['MAX_PAGE_SIZE']))
+
+
+def paginate(query, columns, cursor=None, size=None):
+    #Seek past the cursor instead of using OFFSET, so every page costs the same
+    size = size or page_size()
+
+    if cursor:
+        query = query.filter(tuple_(*columns) > tuple_(*decode_cursor(cursor, columns)))
+
+    rows = query.order_by(*columns).limit(size + 1).all()
+    next_cursor = None
+
+    if len(rows) > size:
+        rows = rows[:size]
+        next_cursor = encode_cursor([getattr(rows[-1], column.key) for column in columns])
+
+    return rows, next_cursor
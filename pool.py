@@ -0,0 +1,88 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+#----------------------------------------------------------------------------#
+# Connection pool metrics.
+#----------------------------------------------------------------------------#
+
+# Shared by every pool in the process, pools are recreated on dispose()
+POOL_STATS = {'checkouts': 0, 'wait_time': 0.0, 'connect_time': 0.0, 'timeouts': 0}
+POOL_STATS_LOCK = threading.Lock()
+
+# time the current thread's checkout spent opening a new connection
+_connecting = threading.local()
+
+
+class TimedQueuePool(QueuePool):
+    #QueuePool that records how long each checkout waited for a connection,
+    #time spent opening a new one is counted separately
+
+    def _create_connection(self):
+        started = time.perf_counter()
+        try:
+            return super(TimedQueuePool, self)._create_connection()
+        finally:
+            _connecting.time = getattr(_connecting, 'time', 0.0) + time.perf_counter() - started
+
+    def _do_get(self):
+        _connecting.time = 0.0
+        started = time.perf_counter()
+        try:
+            connection = super(TimedQueuePool, self)._do_get()
+        except exc.TimeoutError:
+            with POOL_STATS_LOCK:
+                POOL_STATS['timeouts'] += 1
+            raise
+        connect_time = _connecting.time
+        with POOL_STATS_LOCK:
+            POOL_STATS['checkouts'] += 1
+            POOL_STATS['wait_time'] += time.perf_counter() - started - connect_time
+            POOL_STATS['connect_time'] += connect_time
+        return connection
+
+
+class PoolMetrics(object):
+
+    def __init__(self, app=None, db=None):
+        self.db = db
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        #the engine is created lazily, so the pool class can still be swapped here
+        self.db = db
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}), poolclass=TimedQueuePool)
+        if 'profiler' in app.extensions:
+            app.extensions['profiler'].register_collector(self.collect)
+
+    def collect(self):
+        pool = self.db.engine.pool
+        with POOL_STATS_LOCK:
+            stats = dict(POOL_STATS)
+
+        return [
+            '# HELP fyyur_db_pool_size Configured pool size.',
+            '# TYPE fyyur_db_pool_size gauge',
+            f'fyyur_db_pool_size {pool.size()}',
+            '# HELP fyyur_db_pool_checked_out Connections currently checked out.',
+            '# TYPE fyyur_db_pool_checked_out gauge',
+            f'fyyur_db_pool_checked_out {pool.checkedout()}',
+            '# HELP fyyur_db_pool_overflow Connections open beyond pool_size, negative while the pool is filling.',
+            '# TYPE fyyur_db_pool_overflow gauge',
+            f'fyyur_db_pool_overflow {pool.overflow()}',
+            '# HELP fyyur_db_pool_checkouts_total Connections handed out by the pool.',
+            '# TYPE fyyur_db_pool_checkouts_total counter',
+            f"fyyur_db_pool_checkouts_total {stats['checkouts']}",
+            '# HELP fyyur_db_pool_wait_seconds_total Time spent waiting for a pooled connection.',
+            '# TYPE fyyur_db_pool_wait_seconds_total counter',
+            f"fyyur_db_pool_wait_seconds_total {stats['wait_time']}",
+            '# HELP fyyur_db_pool_connect_seconds_total Time spent opening new connections during checkouts.',
+            '# TYPE fyyur_db_pool_connect_seconds_total counter',
+            f"fyyur_db_pool_connect_seconds_total {stats['connect_time']}",
+            '# HELP fyyur_db_pool_timeouts_total Checkouts that failed waiting for a connection.',
+            '# TYPE fyyur_db_pool_timeouts_total counter',
+            f"fyyur_db_pool_timeouts_total {stats['timeouts']}",
+        ]
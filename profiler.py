@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import defaultdict
+
+from flask import current_app, g, request, Response, has_request_context, before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+#----------------------------------------------------------------------------#
+# Request profiler.
+#----------------------------------------------------------------------------#
+
+# Per endpoint totals exported on /metrics
+METRICS = (
+    ('requests', 'fyyur_requests_total', 'Requests served.'),
+    ('statements', 'fyyur_db_statements_total', 'SQL statements executed.'),
+    ('db_time', 'fyyur_db_seconds_total', 'Time spent waiting on the database.'),
+    ('render_time', 'fyyur_template_seconds_total', 'Time spent rendering templates.'),
+    ('wall_time', 'fyyur_request_seconds_total', 'Wall clock time spent serving requests.'),
+)
+
+
+class RequestProfiler(object):
+
+    def __init__(self, app=None):
+        self.lock = threading.Lock()
+        self.totals = defaultdict(lambda: defaultdict(float))
+        self.collectors = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics)
+        app.extensions['profiler'] = self
+
+    def register_collector(self, collector):
+        #collector() returns a list of Prometheus exposition lines
+        self.collectors.append(collector)
+
+    #  Hooks
+    #  ----------------------------------------------------------------
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+        profile = g.get('profile') if has_request_context() else None
+        if profile is not None:
+            profile['statements'] += 1
+            profile['db_time'] += elapsed
+
+    def _before_render(self, sender, template, context, **extra):
+        if 'profile' in g:
+            g.render_start_time = time.perf_counter()
+
+    def _after_render(self, sender, template, context, **extra):
+        if 'profile' in g and 'render_start_time' in g:
+            g.profile['render_time'] += time.perf_counter() - g.pop('render_start_time')
+
+    def _start_request(self):
+        g.profile = {
+            'requests': 1,
+            'statements': 0,
+            'db_time': 0.0,
+            'render_time': 0.0,
+            'wall_time': time.perf_counter()
+        }
+
+    def _finish_request(self, response):
+        profile = g.pop('profile', None)
+        if profile is None or request.endpoint in (None, 'metrics', 'static'):
+            return response
+
+        profile['wall_time'] = time.perf_counter() - profile['wall_time']
+
+        with self.lock:
+            totals = self.totals[request.endpoint]
+            for key, value in profile.items():
+                totals[key] += value
+
+        if current_app.debug:
+            response.headers['X-DB-Statement-Count'] = str(profile['statements'])
+            response.headers['Server-Timing'] = ', '.join([
+                f"db;dur={profile['db_time'] * 1000:.2f}",
+                f"render;dur={profile['render_time'] * 1000:.2f}",
+                f"total;dur={profile['wall_time'] * 1000:.2f}"
+            ])
+        return response
+
+    #  Metrics
+    #  ----------------------------------------------------------------
+
+    def metrics(self):
+        with self.lock:
+            totals = {endpoint: dict(values) for endpoint, values in self.totals.items()}
+
+        lines = []
+        for key, name, description in METRICS:
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} counter')
+            for endpoint in sorted(totals):
+                value = totals[endpoint].get(key, 0)
+                lines.append(f'{name}{{endpoint="{endpoint}"}} {value}')
+
+        for collector in self.collectors:
+            lines.extend(collector())
+
+        return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
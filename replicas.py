@@ -0,0 +1,117 @@
+import random
+import threading
+import time
+from fnmatch import fnmatch
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy import SQLAlchemy, SignallingSession, get_state
+from sqlalchemy import event, orm
+from sqlalchemy.orm import Session
+
+#----------------------------------------------------------------------------#
+# Read replicas.
+#----------------------------------------------------------------------------#
+
+# Replica URIs are registered as Flask-SQLAlchemy binds replica_0, replica_1, ... (see config.py)
+REPLICA_BIND_PREFIX = 'replica_'
+
+# Set on the response after a write, while it is valid the visitor reads from the primary
+STICKY_COOKIE = 'db_primary_until'
+
+
+class RoutingSession(SignallingSession):
+    #Reads go to the replica picked for the request, flushes always go to the primary
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        bind_key = g.get('db_replica') if has_request_context() else None
+        if bind_key is not None and not self._flushing:
+            #SignallingSession keeps the app but not the SQLAlchemy object
+            return get_state(self.app).db.get_engine(self.app, bind=bind_key)
+        return super(RoutingSession, self).get_bind(mapper, clause, **kwargs)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+
+class ReplicaRouter(object):
+    #Picks the primary or a replica per request from DB_REPLICA_ENDPOINTS
+
+    def __init__(self, app=None):
+        self.lock = threading.Lock()
+        self.routed = {'primary': 0, 'replica': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.endpoints = app.config['DB_REPLICA_ENDPOINTS']
+        self.sticky_seconds = app.config['DB_STICKY_SECONDS']
+        self.binds = sorted(key for key in app.config.get('SQLALCHEMY_BINDS') or {} if key.startswith(REPLICA_BIND_PREFIX))
+        event.listen(Session, 'after_flush', self._after_flush)
+        event.listen(Session, 'after_bulk_update', self._after_bulk)
+        event.listen(Session, 'after_bulk_delete', self._after_bulk)
+        event.listen(Session, 'after_commit', self._after_commit)
+        event.listen(Session, 'after_rollback', self._after_rollback)
+        app.before_request(self._route)
+        app.after_request(self._stick)
+        app.extensions['replica_router'] = self
+        if 'profiler' in app.extensions:
+            app.extensions['profiler'].register_collector(self.collect)
+
+    def is_read_only(self, endpoint):
+        return any(fnmatch(endpoint or '', pattern) for pattern in self.endpoints)
+
+    def is_sticky(self):
+        #the visitor committed a write recently and the replicas may not have it yet
+        try:
+            return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    #  Hooks
+    #  ----------------------------------------------------------------
+
+    def _route(self):
+        if self.binds and self.is_read_only(request.endpoint) and not self.is_sticky():
+            g.db_replica = random.choice(self.binds)
+            self._count('replica')
+        else:
+            g.db_primary_pinned = self.is_sticky()
+            self._count('primary')
+
+    def _after_flush(self, session, flush_context):
+        session.info['replica_router_wrote'] = True
+
+    def _after_bulk(self, update_context):
+        update_context.session.info['replica_router_wrote'] = True
+
+    def _after_commit(self, session):
+        if session.info.pop('replica_router_wrote', False) and has_request_context():
+            g.db_wrote = True
+
+    def _after_rollback(self, session):
+        session.info.pop('replica_router_wrote', None)
+
+    def _stick(self, response):
+        #without replicas every read is on the primary already
+        if self.binds and g.get('db_wrote') and self.sticky_seconds:
+            response.set_cookie(STICKY_COOKIE, f'{time.time() + self.sticky_seconds:.0f}', max_age=self.sticky_seconds, httponly=True)
+        return response
+
+    def _count(self, target):
+        with self.lock:
+            self.routed[target] += 1
+
+    #  Metrics
+    #  ----------------------------------------------------------------
+
+    def collect(self):
+        with self.lock:
+            routed = dict(self.routed)
+
+        return [
+            '# HELP fyyur_db_routed_requests_total Requests by the database they read from.',
+            '# TYPE fyyur_db_routed_requests_total counter',
+        ] + [f'fyyur_db_routed_requests_total{{target="{target}"}} {count}' for target, count in sorted(routed.items())]
@@ -0,0 +1,35 @@
+import re
+
+from flask import current_app
+from sqlalchemy import func
+
+#----------------------------------------------------------------------------#
+# Full text search.
+#----------------------------------------------------------------------------#
+
+# Text search configuration shared with the search_vector triggers
+SEARCH_CONFIG = 'simple'
+
+
+def build_tsquery(term):
+    #'san fra' -> 'san:* & fra:*' so every word matches as a prefix
+    tokens = re.findall(r'\w+', term.lower())
+    if not tokens:
+        return None
+    return ' & '.join(f'{token}:*' for token in tokens)
+
+
+def search(query, model, term, limit=None):
+    #Ranked matches of term against model.search_vector, best first
+    limit = limit or current_app.config['SEARCH_LIMIT']
+    tsquery = build_tsquery(term)
+
+    if tsquery is None:
+        return query.order_by(model.name, model.id).limit(limit).all()
+
+    tsquery = func.to_tsquery(SEARCH_CONFIG, tsquery)
+    return query.filter(
+        model.search_vector.op('@@')(tsquery)
+    ).order_by(
+        func.ts_rank_cd(model.search_vector, tsquery).desc(), model.id
+    ).limit(limit).all()
@@ -0,0 +1,145 @@
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate, islice
+
+import click
+
+#----------------------------------------------------------------------------#
+# Synthetic data.
+#----------------------------------------------------------------------------#
+
+# (city, state, weight): a few big markets and a long tail, like real listings
+CITIES = [
+    ('New York', 'NY', 30), ('Los Angeles', 'CA', 22), ('San Francisco', 'CA', 14), ('Chicago', 'IL', 12),
+    ('Austin', 'TX', 10), ('Nashville', 'TN', 8), ('Seattle', 'WA', 7), ('New Orleans', 'LA', 6),
+    ('Portland', 'OR', 4), ('Denver', 'CO', 4), ('Atlanta', 'GA', 4), ('Boston', 'MA', 3),
+    ('Detroit', 'MI', 2), ('Minneapolis', 'MN', 2), ('Philadelphia', 'PA', 2), ('Miami', 'FL', 2),
+    ('Kansas City', 'MO', 1), ('Memphis', 'TN', 1), ('Richmond', 'VA', 1), ('Tucson', 'AZ', 1),
+]
+
+# (genre, weight)
+GENRES = [
+    ('Rock n Roll', 20), ('Pop', 16), ('Hip-Hop', 14), ('Jazz', 10), ('Electronic', 9), ('Alternative', 8),
+    ('Country', 6), ('R&B', 6), ('Folk', 4), ('Blues', 4), ('Soul', 3), ('Punk', 3), ('Classical', 3),
+    ('Reggae', 2), ('Funk', 2), ('Heavy Metal', 2), ('Instrumental', 1), ('Musical Theatre', 1), ('Other', 1),
+]
+
+NAME_WORDS = [
+    'Blue', 'Velvet', 'Electric', 'Golden', 'Midnight', 'Silver', 'Neon', 'Crimson', 'Wild', 'Lucky',
+    'Echo', 'Harbor', 'River', 'Garden', 'Lantern', 'Fox', 'Owl', 'Parlor', 'Room', 'Hall', 'Tavern',
+    'Sound', 'Theory', 'Collective', 'Band', 'Trio', 'Quartet', 'Machine', 'Kids', 'Union',
+]
+
+
+def pick_genres(rng):
+    genres, weights = zip(*GENRES)
+    return sorted(set(rng.choices(genres, weights=weights, k=rng.randint(1, 3))))
+
+
+def pick_city(rng):
+    city, state, _ = rng.choices(CITIES, weights=[weight for _, _, weight in CITIES])[0]
+    return city, state
+
+
+def make_name(rng, index):
+    return f'{rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)} {index}'
+
+
+def generate_venues(rng, count):
+    for index in range(count):
+        city, state = pick_city(rng)
+        yield {
+            'name': make_name(rng, index),
+            'city': city,
+            'state': state,
+            'address': f'{rng.randint(1, 9999)} {rng.choice(NAME_WORDS)} St',
+            'phone': f'{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}',
+            'genres': pick_genres(rng),
+            'facebook_link': f'https://www.facebook.com/venue{index}',
+            'image_link': f'https://picsum.photos/seed/venue{index}/400/300',
+            'website_link': f'https://venue{index}.example.com',
+            'seeking_talent': rng.random() < 0.4,
+            'seeking_description': 'Looking for local acts.',
+        }
+
+
+def generate_artists(rng, count):
+    for index in range(count):
+        city, state = pick_city(rng)
+        yield {
+            'name': make_name(rng, index),
+            'city': city,
+            'state': state,
+            'phone': f'{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}',
+            'genres': pick_genres(rng),
+            'facebook_link': f'https://www.facebook.com/artist{index}',
+            'image_link': f'https://picsum.photos/seed/artist{index}/400/300',
+            'website_link': f'https://artist{index}.example.com',
+            'seeking_venue': rng.random() < 0.5,
+            'seeking_description': 'Available for weekend shows.',
+        }
+
+
+def zipf_weights(count):
+    #cumulative 1/rank weights, so the first ids are the popular ones
+    return list(accumulate(1 / rank for rank in range(1, count + 1)))
+
+
+def generate_shows(rng, count, venue_ids, artist_ids, now):
+    #Two thirds past, one third upcoming, popular venues and artists get most shows
+    venue_weights = zipf_weights(len(venue_ids))
+    artist_weights = zipf_weights(len(artist_ids))
+
+    for _ in range(count):
+        day = now + timedelta(days=rng.randint(-730, 365))
+        yield {
+            'venue_id': rng.choices(venue_ids, cum_weights=venue_weights)[0],
+            'artist_id': rng.choices(artist_ids, cum_weights=artist_weights)[0],
+            'start_time': day.replace(hour=rng.choice([19, 20, 21, 22]), minute=0, second=0, microsecond=0),
+        }
+
+
+def insert(db, table, rows, chunk_size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        db.session.execute(table.insert(), chunk)
+        db.session.commit()
+
+
+def seed(venues, artists, shows, random_seed=42, chunk_size=5000):
+    import models
+
+    rng = random.Random(random_seed)
+    db = models.db
+
+    insert(db, models.Venue.__table__, generate_venues(rng, venues), chunk_size)
+    insert(db, models.Artist.__table__, generate_artists(rng, artists), chunk_size)
+
+    venue_ids = [id for (id,) in db.session.query(models.Venue.id).order_by(models.Venue.id)]
+    artist_ids = [id for (id,) in db.session.query(models.Artist.id).order_by(models.Artist.id)]
+    if shows and venue_ids and artist_ids:
+        insert(db, models.Show.__table__, generate_shows(rng, shows, venue_ids, artist_ids, datetime.now()), chunk_size)
+
+    models.refresh_show_counts()
+    models.refresh_genre_facets()
+    models.refresh_upcoming_shows()
+    db.session.commit()
+
+
+def init_app(app):
+
+    @app.cli.command('seed')
+    @click.option('--venues', default=1000, show_default=True)
+    @click.option('--artists', default=5000, show_default=True)
+    @click.option('--shows', default=50000, show_default=True)
+    @click.option('--seed', 'random_seed', default=42, show_default=True, help='Same seed, same data.')
+    @click.option('--chunk-size', default=5000, show_default=True)
+    def seed_command(venues, artists, shows, random_seed, chunk_size):
+        """Fill the database with synthetic venues, artists and shows."""
+        started = time.perf_counter()
+        seed(venues, artists, shows, random_seed, chunk_size)
+        click.echo(f'Seeded {venues} venues, {artists} artists, {shows} shows in {time.perf_counter() - started:.1f}s.')
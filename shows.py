@@ -0,0 +1,120 @@
+import sys
+from datetime import date, timedelta
+
+import click
+from flask import Blueprint, render_template, request, flash, abort
+
+from extensions import db, page_cache
+from models import (
+    Show, show_duration, booking_conflicts, count_new_show, refresh_show_counts, roll_over_show_counts,
+    feed_range, upcoming_feed, refresh_upcoming_shows, roll_forward_upcoming_shows
+)
+
+#----------------------------------------------------------------------------#
+# Shows.
+#----------------------------------------------------------------------------#
+
+bp = Blueprint('shows', __name__, cli_group=None)
+
+
+# query args of the feed, kept on the pager links
+FEED_FILTERS = ('city', 'state', 'genre', 'when', 'from', 'to')
+
+
+def parse_day(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        abort(400)
+
+
+@bp.route('/shows')
+@page_cache.cached
+def shows():
+    #Upcoming shows, optionally ?city=&state=, ?genre=, ?when=today|weekend|week or ?from=&to= (YYYY-MM-DD)
+    first_day, last_day = feed_range(request.args.get('when'))
+    first_day = parse_day('from') or first_day
+    last_day = parse_day('to') or last_day
+    data, next_cursor = upcoming_feed(
+        request.args.get('city'), request.args.get('state'), first_day, last_day, request.args.get('genre'), request.args.get('after')
+    )
+    filters = {name: request.args[name] for name in FEED_FILTERS if request.args.get(name)}
+
+    return render_template('pages/shows.html', shows=data, next_cursor=next_cursor, filters=filters)
+
+
+@bp.route('/shows/create', methods=['GET'])
+def create_shows():
+    # renders form. do not touch.
+    from forms import ShowForm
+    form = ShowForm()
+    return render_template('forms/new_show.html', form=form)
+
+
+@bp.route('/shows/create', methods=['POST'])
+def create_show_submission():
+    import dateutil.parser
+
+    error = False
+    conflict = False
+    try:
+        data = request.form
+        start_time = dateutil.parser.parse(data['start_time'])
+        end_time = start_time + show_duration()
+
+        if booking_conflicts(data['venue_id'], data['artist_id'], start_time, end_time):
+            conflict = True
+            db.session.rollback()
+        else:
+            show = Show(artist_id=data['artist_id'], venue_id=data['venue_id'], start_time=start_time, end_time=end_time)
+
+            db.session.add(show)
+            count_new_show(show)
+            db.session.commit()
+
+    except:
+        db.session.rollback()
+        error = True
+        print(sys.exc_info())
+
+    finally:
+        db.session.close()
+
+    if error == True:
+        flash("An error occurred.Show not listed.")
+    elif conflict:
+        flash("Show not listed. The artist or the venue is already booked at that time.")
+    else:
+        flash("Show successfully listed!")
+
+    return render_template('pages/home.html')
+
+#  Commands
+#  ----------------------------------------------------------------
+
+
+@bp.cli.command('rollover-show-counts')
+@click.option('--window', default=60, show_default=True, help='Minutes back to look for shows that started.')
+@click.option('--all', 'recount_all', is_flag=True, help='Recount every venue and artist instead.')
+def rollover_show_counts(window, recount_all):
+    """Move started shows from the upcoming to the past counters."""
+    if recount_all:
+        refresh_show_counts()
+    else:
+        roll_over_show_counts(timedelta(minutes=window))
+    db.session.commit()
+
+
+@bp.cli.command('rollover-upcoming-shows')
+@click.option('--window', default=60, show_default=True, help='Minutes since the last run, shows that entered the feed horizon since then are added.')
+@click.option('--all', 'rebuild', is_flag=True, help='Rebuild the whole feed table instead.')
+def rollover_upcoming_shows(window, rebuild):
+    """Drop started shows from the upcoming feed and add newly bookable days."""
+    if rebuild:
+        refresh_upcoming_shows()
+    else:
+        roll_forward_upcoming_shows(timedelta(minutes=window))
+    db.session.commit()
@@ -0,0 +1,41 @@
+from flask import current_app
+
+from extensions import db
+from images import ImageError
+import models
+
+#----------------------------------------------------------------------------#
+# Background tasks.
+#----------------------------------------------------------------------------#
+
+# Follow-up work of the write views, run by the job queue after the request.
+
+
+def refresh_upcoming_shows(venue_ids=None, artist_ids=None):
+    #Copy renamed/moved venues and artists into their feed rows
+    models.refresh_upcoming_shows(venue_ids=venue_ids, artist_ids=artist_ids)
+    db.session.commit()
+    current_app.extensions['page_cache'].clear()
+
+
+def clear_page_cache():
+    current_app.extensions['page_cache'].clear()
+
+
+def prefetch_image(link):
+    #Fetch a new image link and render its thumbnails before the first page view
+    try:
+        current_app.extensions['image_proxy'].prefetch(link)
+    except ImageError as error:
+        #a broken link is not worth retrying, /img/ falls back to the link itself
+        current_app.logger.warning(str(error))
+
+
+def evict_image_cache():
+    current_app.extensions['image_proxy'].cache.evict()
+
+
+def register(queue):
+    #Called from create_app(), so the tasks exist wherever the queue is set up
+    for task in (refresh_upcoming_shows, clear_page_cache, prefetch_image, evict_image_cache):
+        queue.task(task)
@@ -0,0 +1,88 @@
+import os
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from extensions import db
+
+#----------------------------------------------------------------------------#
+# Fixtures.
+#----------------------------------------------------------------------------#
+
+# Tests run against TEST_DATABASE_URL (see TestingConfig), migrated from an
+# empty schema, and are skipped when no server is reachable there.
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+
+def reset_database(app):
+    #Drop everything and run the migrations, so tests see the same DDL as production
+    from flask_migrate import upgrade
+
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(db.text('DROP SCHEMA public CASCADE; CREATE SCHEMA public'))
+        upgrade(directory=MIGRATIONS)
+        db.engine.dispose()
+
+
+def truncate_tables(app):
+    with app.app_context():
+        tables = ', '.join(table.name for table in db.metadata.sorted_tables)
+        db.session.execute(db.text(f'TRUNCATE {tables} RESTART IDENTITY CASCADE'))
+        db.session.commit()
+        db.session.remove()
+
+
+def connect_or_skip(app):
+    try:
+        with app.app_context():
+            db.engine.connect().close()
+    except OperationalError as error:
+        pytest.skip(f'Test database not reachable: {error}')
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app('testing')
+    connect_or_skip(app)
+    reset_database(app)
+    return app
+
+
+@pytest.fixture
+def database(app):
+    #Empties every table after the test
+    yield db
+    truncate_tables(app)
+
+
+@pytest.fixture
+def context(app, database):
+    #App context for tests calling models directly; view tests use `client`
+    #instead, a pushed context would be shared with the requests it makes
+    with app.app_context():
+        yield
+        db.session.rollback()
+
+
+@pytest.fixture
+def client(app, database):
+    return app.test_client()
+
+
+@pytest.fixture
+def statements(app):
+    #SQL statements executed while the test runs
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', record)
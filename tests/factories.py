@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import Artist, Show, Venue
+
+#----------------------------------------------------------------------------#
+# Test data.
+#----------------------------------------------------------------------------#
+
+# Each helper adds and flushes one row, keyword arguments override the defaults
+
+
+def make_venue(**values):
+    venue = Venue(**dict({
+        'name': 'The Musical Hop',
+        'city': 'San Francisco',
+        'state': 'CA',
+        'address': '1015 Folsom Street',
+        'phone': '123-123-1234',
+        'genres': ['Jazz', 'Reggae'],
+        'facebook_link': 'https://www.facebook.com/TheMusicalHop',
+        'image_link': 'https://example.com/musical-hop.jpg',
+        'website_link': 'https://www.themusicalhop.com',
+        'seeking_talent': True,
+        'seeking_description': 'We are on the lookout for a local artist.',
+    }, **values))
+    db.session.add(venue)
+    db.session.flush()
+    return venue
+
+
+def make_artist(**values):
+    artist = Artist(**dict({
+        'name': 'Guns N Petals',
+        'city': 'San Francisco',
+        'state': 'CA',
+        'phone': '326-123-5000',
+        'genres': ['Rock n Roll'],
+        'facebook_link': 'https://www.facebook.com/GunsNPetals',
+        'image_link': 'https://example.com/guns-n-petals.jpg',
+        'website_link': 'https://www.gunsnpetalsband.com',
+        'seeking_venue': True,
+        'seeking_description': 'Looking for shows to perform at in the San Francisco Bay Area!',
+    }, **values))
+    db.session.add(artist)
+    db.session.flush()
+    return artist
+
+
+def make_show(artist, venue, start_time=None, **values):
+    show = Show(artist_id=artist.id, venue_id=venue.id, start_time=start_time or datetime.now() + timedelta(days=1), **values)
+    db.session.add(show)
+    db.session.flush()
+    return show
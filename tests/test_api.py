@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import Show
+from tests.factories import make_artist, make_show, make_venue
+
+
+def test_venue_detail_revalidates_on_etag_only(app, client):
+    with app.app_context():
+        venue = make_venue()
+        make_show(make_artist(), venue, datetime.now() + timedelta(days=1))
+        db.session.commit()
+        venue_id = venue.id
+
+    response = client.get(f'/api/v1/venues/{venue_id}')
+    assert response.status_code == 200
+    assert 'Last-Modified' not in response.headers
+    etag = response.headers['ETag']
+    assert client.get(f'/api/v1/venues/{venue_id}', headers={'If-None-Match': etag}).status_code == 304
+
+    #deleting a show changes the payload but no updated_at
+    with app.app_context():
+        Show.query.delete()
+        db.session.commit()
+
+    response = client.get(f'/api/v1/venues/{venue_id}', headers={
+        'If-None-Match': etag,
+        'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT',
+    })
+    assert response.status_code == 200
+    assert response.json['upcoming_shows'] == []
@@ -0,0 +1,15 @@
+from assets import rebase_urls
+
+
+def test_bundled_css_points_at_static_fonts():
+    css = 'src:url("../fonts/glyphicons-halflings-regular.eot?#iefix");background:url(../img/logo.png)'
+
+    assert rebase_urls(css, 'css/bootstrap.min.css', '/static') == (
+        'src:url("/static/fonts/glyphicons-halflings-regular.eot?#iefix");background:url(/static/img/logo.png)'
+    )
+
+
+def test_absolute_and_inline_urls_are_left_alone():
+    css = "a{background:url(data:image/png;base64,AAAA)}b{background:url('https://example.com/a.png')}c{background:url(/x.png)}"
+
+    assert rebase_urls(css, 'css/main.css', '/static') == css
@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+
+import babel.dates
+
+from formatting import format_datetime
+
+
+def test_naive_times_are_shown_as_stored():
+    assert format_datetime(datetime(2019, 5, 21, 21, 30), 'medium', 'en_US', 'Europe/Berlin') == 'Tue 05, 21, 2019 9:30PM'
+
+
+def test_aware_times_are_shown_in_the_visitor_timezone():
+    start_time = datetime(2019, 5, 21, 19, 30, tzinfo=timezone.utc)
+
+    assert format_datetime(start_time, 'medium', 'en_US', 'Europe/Berlin') == 'Tue 05, 21, 2019 9:30PM'
+
+
+def test_babel_named_formats():
+    #babel's own output, newer CLDR data puts a narrow no-break space before PM
+    expected = babel.dates.format_datetime(datetime(2019, 5, 21, 21, 30), 'short', locale='en_US')
+
+    assert format_datetime('2019-05-21T21:30:00', 'short', 'en_US', 'UTC') == expected
@@ -0,0 +1,53 @@
+from extensions import db
+from tests.factories import make_artist, make_show, make_venue
+
+
+def add_jazz_and_rock(app):
+    with app.app_context():
+        jazz_club = make_venue(name='Jazz Club', genres=['Jazz', 'Blues'])
+        rock_hall = make_venue(name='Rock Hall', genres=['Rock n Roll'])
+        make_show(make_artist(name='Sax Band', genres=['Jazz']), jazz_club)
+        make_show(make_artist(name='Guitar Band', genres=['Rock n Roll', 'Punk']), rock_hall)
+        db.session.commit()
+
+
+def test_venues_filter_by_genre(app, client):
+    add_jazz_and_rock(app)
+    with app.app_context():
+        from models import venue_areas
+        areas, _ = venue_areas(genre='Jazz')
+
+    assert [venue['name'] for area in areas for venue in area['venues']] == ['Jazz Club']
+
+    response = client.get('/venues?genre=Jazz')
+    assert response.status_code == 200
+    assert b'Jazz Club' in response.data
+    assert b'Rock Hall' not in response.data
+
+
+def test_artists_filter_by_genre(app, client):
+    add_jazz_and_rock(app)
+    with app.app_context():
+        from models import artist_list
+        artists, _ = artist_list(genre='Punk')
+
+    assert [artist['name'] for artist in artists] == ['Guitar Band']
+
+    response = client.get('/artists?genre=Jazz')
+    assert response.status_code == 200
+    assert b'Sax Band' in response.data
+    assert b'Guitar Band' not in response.data
+
+
+def test_shows_filter_by_artist_genre(app, client):
+    add_jazz_and_rock(app)
+    with app.app_context():
+        from models import upcoming_feed
+        shows, _ = upcoming_feed(genre='Punk')
+
+    assert [show['artist_name'] for show in shows] == ['Guitar Band']
+
+    response = client.get('/shows?genre=Jazz')
+    assert response.status_code == 200
+    assert b'Sax Band' in response.data
+    assert b'Guitar Band' not in response.data
@@ -0,0 +1,35 @@
+import os
+import time
+
+from images import EVICT_MARKER, EVICT_TIMEOUT, DiskCache
+
+
+def fill(root, max_bytes=100):
+    cache = DiskCache(str(root), max_bytes)
+    for index in range(3):
+        cache.write(b'x' * 60, 'originals', f'{index:064x}')
+    return cache
+
+
+def test_one_eviction_across_processes(tmp_path):
+    #two caches on one directory stand in for two worker processes
+    first = fill(tmp_path)
+    second = fill(tmp_path)
+
+    assert first.over_limit()
+    assert not second.over_limit()
+    assert not first.over_limit()
+
+    assert second.evict() == 2
+    assert not os.path.exists(tmp_path / EVICT_MARKER)
+    assert second.total == 60
+
+
+def test_stale_eviction_marker_is_taken_over(tmp_path):
+    cache = fill(tmp_path)
+    (tmp_path / EVICT_MARKER).touch()
+    assert not cache.over_limit()
+
+    stale = time.time() - EVICT_TIMEOUT - 1
+    os.utime(tmp_path / EVICT_MARKER, (stale, stale))
+    assert cache.over_limit()
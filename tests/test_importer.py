@@ -0,0 +1,123 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from exporter import export_columns, generate
+from extensions import db
+from importer import Importer, read_rows
+from models import Artist, Show, Venue
+from tests.factories import make_artist, make_show, make_venue
+
+VENUE = {
+    'name': 'The Dueling Pianos Bar',
+    'city': 'New York',
+    'state': 'NY',
+    'address': '335 Delancey Street',
+    'phone': '914-003-1132',
+    'genres': ['Classical', 'R&B', 'Hip-Hop'],
+    'facebook_link': 'https://www.facebook.com/theduelingpianos',
+    'image_link': 'https://example.com/dueling-pianos.jpg',
+    'website_link': 'https://www.theduelingpianos.com',
+    'seeking_talent': False,
+    'seeking_description': '',
+}
+
+
+def run_import(kind, path):
+    report = io.StringIO()
+    importer = Importer(kind, chunk_size=2, rejects=csv.writer(report))
+    importer.run(read_rows(str(path), 'ndjson'))
+    importer.finish()
+    return importer, list(csv.reader(io.StringIO(report.getvalue())))
+
+
+def test_malformed_ndjson_lines_are_rejected(context, tmp_path):
+    path = tmp_path / 'venues.ndjson'
+    path.write_text('\n'.join([
+        json.dumps(VENUE),
+        '{"name": "Half a venue", ',
+        '["not", "an", "object"]',
+        json.dumps(dict(VENUE, name='The Musical Hop')),
+    ]) + '\n')
+
+    importer, rejects = run_import('venues', path)
+
+    assert (importer.inserted, importer.rejected) == (2, 2)
+    assert [line for line, _, _ in rejects] == ['2', '3']
+    assert json.loads(rejects[0][2]) == '{"name": "Half a venue", '
+    assert sorted(name for (name,) in Venue.query.with_entities(Venue.name)) == ['The Dueling Pianos Bar', 'The Musical Hop']
+
+
+def test_shows_ending_before_they_start_are_rejected(context, tmp_path):
+    artist = make_artist()
+    venue = make_venue()
+    db.session.commit()
+    start = datetime(2035, 5, 21, 21, 30)
+    path = tmp_path / 'shows.ndjson'
+    path.write_text('\n'.join(json.dumps({
+        'artist_id': artist.id,
+        'venue_id': venue.id,
+        'start_time': str(start),
+        'end_time': str(start + timedelta(hours=hours)),
+    }) for hours in (2, -1, 0)) + '\n')
+
+    importer, rejects = run_import('shows', path)
+
+    assert (importer.inserted, importer.rejected) == (1, 2)
+    assert [line for line, _, _ in rejects] == ['2', '3']
+    assert json.loads(rejects[0][1]) == {'end_time': 'Must be after start_time.'}
+
+
+def snapshot(model):
+    #every exported column, timestamps to the second as exported
+    columns = export_columns(model)
+    return [
+        tuple(value.replace(microsecond=0) if isinstance(value, datetime) else value for value in row)
+        for row in db.session.query(*columns).order_by(model.id)
+    ]
+
+
+@pytest.mark.parametrize('file_format', ['ndjson', 'csv'])
+def test_export_imports_back_unchanged(context, tmp_path, file_format):
+    guns = make_artist()
+    sax = make_artist(name='The Wild Sax Band', genres=['Jazz', 'Classical'], seeking_venue=False)
+    hop = make_venue()
+    pianos = make_venue(**VENUE)
+    start = datetime.now().replace(microsecond=0)
+    make_show(sax, pianos, start + timedelta(days=3))
+    make_show(guns, hop, start - timedelta(days=3), end_time=start - timedelta(days=3) + timedelta(hours=1))
+    db.session.commit()
+
+    before = {model: snapshot(model) for model in (Artist, Venue, Show)}
+    for kind in ('artists', 'venues', 'shows'):
+        (tmp_path / f'{kind}.{file_format}').write_text(''.join(generate(kind, file_format)))
+
+    tables = ', '.join(table.name for table in db.metadata.sorted_tables)
+    db.session.execute(db.text(f'TRUNCATE {tables} RESTART IDENTITY CASCADE'))
+    db.session.commit()
+
+    for kind in ('artists', 'venues', 'shows'):
+        report = io.StringIO()
+        importer = Importer(kind, rejects=csv.writer(report))
+        importer.run(read_rows(str(tmp_path / f'{kind}.{file_format}'), file_format))
+        importer.finish()
+        assert importer.rejected == 0, report.getvalue()
+
+    assert {model: snapshot(model) for model in (Artist, Venue, Show)} == before
+    #the id sequence moved past the imported rows
+    assert make_venue(name='After the import').id == 3
+
+
+@pytest.mark.parametrize('file_format', ['ndjson', 'csv'])
+def test_export_is_sent_in_large_chunks(context, file_format):
+    for index in range(300):
+        make_artist(name=f'Artist {index}')
+    db.session.commit()
+
+    chunks = list(generate('artists', file_format))
+
+    assert len(chunks) > 1
+    assert all(len(chunk) > 65536 for chunk in chunks[:-1])
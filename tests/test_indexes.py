@@ -0,0 +1,55 @@
+import pytest
+
+from extensions import db
+from models import Artist, Venue, artist_shows, venue_shows
+from tests.factories import make_artist, make_venue
+
+# The tables are tiny here, so sequential scans are switched off for the
+# transaction: the checks prove the planner *can* answer each query from
+# the index, which is what stops working when an index goes missing.
+
+
+def plan(query):
+    statement = query.statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True})
+    db.session.execute(db.text('SET LOCAL enable_seqscan = off'))
+    return '\n'.join(row[0] for row in db.session.execute(db.text(f'EXPLAIN {statement}')))
+
+
+@pytest.fixture
+def catalog(context):
+    #a venue's or artist's shows are a small slice of a big table, or reading
+    #a GiST period index (see booking_conflicts) and sorting looks as cheap
+    artist = make_artist()
+    venue = make_venue()
+    for index in range(9):
+        make_artist(name=f'Artist {index}')
+        make_venue(name=f'Venue {index}')
+    db.session.execute(db.text(
+        "INSERT INTO shows (artist_id, venue_id, start_time, end_time) "
+        "SELECT a.id, v.id, now() + n * interval '1 day', now() + n * interval '1 day' + interval '3 hours' "
+        "FROM generate_series(1, 20) AS n, artists AS a, venues AS v"
+    ))
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+    return artist, venue
+
+
+def test_venue_shows_use_venue_start_time_index(catalog):
+    _, venue = catalog
+    assert 'ix_shows_venue_id_start_time' in plan(venue_shows(venue.id))
+
+
+def test_artist_shows_use_artist_start_time_index(catalog):
+    artist, _ = catalog
+    assert 'ix_shows_artist_id_start_time' in plan(artist_shows(artist.id))
+
+
+def test_venue_areas_use_state_city_index(catalog):
+    query = db.session.query(Venue.id, Venue.city, Venue.state).order_by(Venue.state, Venue.city, Venue.id).limit(50)
+    assert 'ix_venues_state_city_id' in plan(query)
+
+
+@pytest.mark.parametrize('model, index', [(Venue, 'ix_venues_search_vector'), (Artist, 'ix_artists_search_vector')])
+def test_name_search_uses_search_vector_index(catalog, model, index):
+    query = db.session.query(model.id).filter(model.search_vector.op('@@')(db.func.to_tsquery('simple', 'music:*')))
+    assert index in plan(query)
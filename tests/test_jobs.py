@@ -0,0 +1,32 @@
+from extensions import db
+from jobs import DatabaseBackend
+
+
+def test_database_backend_runs_a_job_through_the_table(app, context):
+    backend = DatabaseBackend(db, poll_interval=0.01)
+
+    backend.push({'name': 'prefetch_image', 'args': {'link': 'https://example.com/a.jpg'}})
+    assert backend.depth() == 1
+
+    job = backend.pop(timeout=1)
+    assert job['name'] == 'prefetch_image'
+    assert job['args'] == {'link': 'https://example.com/a.jpg'}
+    assert job['attempts'] == 1
+    assert backend.depth() == 0
+
+    backend.retry(job, 0, 'timed out')
+    job = backend.pop(timeout=1)
+    assert job['attempts'] == 2
+
+    backend.fail(job, 'timed out again')
+    assert backend.pop(timeout=0) is None
+    assert db.session.execute(db.text('SELECT status, last_error FROM jobs')).fetchall() == [('failed', 'timed out again')]
+
+
+def test_database_backend_deletes_done_jobs(app, context):
+    backend = DatabaseBackend(db, poll_interval=0.01)
+
+    backend.push({'name': 'clear_page_cache', 'args': {}})
+    backend.done(backend.pop(timeout=1))
+
+    assert db.session.execute(db.text('SELECT count(*) FROM jobs')).scalar() == 0
@@ -0,0 +1,52 @@
+import gzip
+
+from flask import flash, get_flashed_messages
+
+from extensions import cache_policy
+from middleware import CompressionMiddleware
+
+
+def etag_app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/html'), ('ETag', '"abc"')])
+    return [b'<p>fyyur</p>' * 100]
+
+
+def call(app, **environ):
+    captured = {}
+
+    def start_response(status, headers, exc_info=None):
+        captured.update(headers)
+
+    body = b''.join(app(dict({'REQUEST_METHOD': 'GET'}, **environ), start_response))
+    return captured, body
+
+
+def test_compressed_response_has_weak_etag():
+    headers, body = call(CompressionMiddleware(etag_app), HTTP_ACCEPT_ENCODING='gzip')
+
+    assert headers['Content-Encoding'] == 'gzip'
+    assert headers['ETag'] == 'W/"abc"'
+    assert gzip.decompress(body) == b'<p>fyyur</p>' * 100
+
+
+def test_uncompressed_response_keeps_strong_etag():
+    headers, _ = call(CompressionMiddleware(etag_app))
+
+    assert headers['ETag'] == '"abc"'
+
+
+def test_page_consuming_flashes_is_not_public(app):
+    with app.test_request_context('/'):
+        flash('Venue The Musical Hop was successfully listed!')
+        get_flashed_messages()
+        response = cache_policy.apply(app.response_class('<p>listed</p>'))
+
+    assert response.headers['Cache-Control'] == 'no-store'
+
+
+def test_pages_vary_on_cookie(app):
+    with app.test_request_context('/'):
+        response = cache_policy.apply(app.response_class('<p>home</p>'))
+
+    assert response.headers['Cache-Control'] == 'public, max-age=300'
+    assert 'Cookie' in response.vary
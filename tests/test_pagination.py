@@ -0,0 +1,61 @@
+import base64
+import json
+
+import pytest
+
+from extensions import db
+from tests.factories import make_artist, make_venue
+
+
+def cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+@pytest.mark.parametrize('path', ['/artists', '/venues', '/shows'])
+@pytest.mark.parametrize('after', [
+    'not base64!',
+    cursor({'a': 1}),
+    cursor([]),
+    cursor(['x', 'y', 'z', 'w']),
+    cursor([None, None, None]),
+    cursor(['CA', 'San Francisco', 'one']),
+    cursor([True]),
+    cursor([1, 2]),
+    cursor(['tomorrow', 1]),
+])
+def test_malformed_cursor_is_bad_request(client, path, after):
+    assert client.get(path, query_string={'after': after}).status_code == 400
+
+
+def test_venue_pages_follow_on(context, app, monkeypatch):
+    from models import venue_areas
+
+    for index in range(5):
+        make_venue(name=f'Venue {index}', city=f'City {index % 2}')
+    db.session.commit()
+    monkeypatch.setitem(app.config, 'PAGE_SIZE', 2)
+
+    names = []
+    after = None
+    while True:
+        areas, after = venue_areas(after)
+        names.extend(venue['name'] for area in areas for venue in area['venues'])
+        if after is None:
+            break
+
+    assert names == ['Venue 0', 'Venue 2', 'Venue 4', 'Venue 1', 'Venue 3']
+
+
+def test_artist_cursor_round_trip(context, app, monkeypatch):
+    from models import artist_list
+
+    for index in range(3):
+        make_artist(name=f'Artist {index}')
+    db.session.commit()
+    monkeypatch.setitem(app.config, 'PAGE_SIZE', 2)
+
+    first, next_cursor = artist_list()
+    second, last_cursor = artist_list(next_cursor)
+
+    assert [artist['name'] for artist in first + second] == ['Artist 0', 'Artist 1', 'Artist 2']
+    assert last_cursor is None
@@ -0,0 +1,44 @@
+import sqlite3
+import time
+
+import pytest
+from sqlalchemy import exc
+
+import pool
+from pool import TimedQueuePool
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = dict.fromkeys(pool.POOL_STATS, 0)
+    monkeypatch.setattr(pool, 'POOL_STATS', stats)
+    return stats
+
+
+def slow_connect():
+    time.sleep(0.05)
+    return sqlite3.connect(':memory:', check_same_thread=False)
+
+
+def test_connect_time_is_not_wait_time(stats):
+    TimedQueuePool(slow_connect, pool_size=1, max_overflow=0).connect().close()
+
+    assert stats['checkouts'] == 1
+    assert stats['connect_time'] >= 0.05
+    assert stats['wait_time'] < 0.05
+
+
+def test_only_pool_timeouts_count_as_timeouts(stats):
+    queue = TimedQueuePool(slow_connect, pool_size=1, max_overflow=0, timeout=0.01)
+    held = queue.connect()
+    with pytest.raises(exc.TimeoutError):
+        queue.connect()
+    held.close()
+
+    def refuse():
+        raise sqlite3.OperationalError('connection refused')
+
+    with pytest.raises(sqlite3.OperationalError):
+        TimedQueuePool(refuse, pool_size=1, max_overflow=0).connect()
+
+    assert stats['timeouts'] == 1
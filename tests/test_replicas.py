@@ -0,0 +1,104 @@
+import os
+import time
+
+import pytest
+
+from extensions import db, replica_router
+from jobs import MemoryBackend
+from models import Venue
+from replicas import STICKY_COOKIE
+from tests.conftest import reset_database
+from tests.factories import make_venue
+
+# A second database stands in for the replica. Nothing replicates into it,
+# so a venue name only found there shows which database a page read from.
+REPLICA_URL = os.environ.get('TEST_REPLICA_DATABASE_URL')
+
+NEW_VENUE = {
+    'name': 'The Dueling Pianos Bar',
+    'city': 'New York',
+    'state': 'NY',
+    'address': '335 Delancey Street',
+    'phone': '914-003-1132',
+    'genres': ['Classical', 'R&B'],
+    'facebook_link': 'https://www.facebook.com/theduelingpianos',
+    'image_link': '',
+    'website_link': 'https://www.theduelingpianos.com',
+    'seeking_description': '',
+}
+
+
+@pytest.fixture
+def replica(app, database, monkeypatch):
+    if not REPLICA_URL:
+        pytest.skip('TEST_REPLICA_DATABASE_URL is not set')
+    primary_url = app.config['SQLALCHEMY_DATABASE_URI']
+    app.config['SQLALCHEMY_DATABASE_URI'] = REPLICA_URL
+    try:
+        reset_database(app)
+    finally:
+        app.config['SQLALCHEMY_DATABASE_URI'] = primary_url
+
+    monkeypatch.setitem(app.config, 'SQLALCHEMY_BINDS', {'replica_0': REPLICA_URL})
+    monkeypatch.setattr(replica_router, 'binds', ['replica_0'])
+    with app.app_context():
+        engine = db.get_engine(app, bind='replica_0')
+        with engine.begin() as connection:
+            connection.execute(Venue.__table__.insert(), {'name': 'Replica Hall', 'city': 'San Francisco', 'state': 'CA', 'genres': ['Jazz']})
+    yield
+    engine.dispose()
+
+
+def set_cookies(response):
+    return ' '.join(response.headers.getlist('Set-Cookie'))
+
+
+def add_primary_venue(app):
+    with app.app_context():
+        make_venue(name='Primary Hall')
+        db.session.commit()
+
+
+def test_reads_go_to_the_replica(app, client, replica):
+    add_primary_venue(app)
+    response = client.get('/venues')
+
+    assert b'Replica Hall' in response.data
+    assert b'Primary Hall' not in response.data
+
+
+def test_write_pins_the_next_read_to_the_primary(app, client, replica):
+    add_primary_venue(app)
+    response = client.post('/venues/create', data=NEW_VENUE)
+    assert STICKY_COOKIE in set_cookies(response)
+
+    response = client.get('/venues')
+    assert b'The Dueling Pianos Bar' in response.data
+    assert b'Replica Hall' not in response.data
+
+
+def test_without_replicas_everything_uses_the_primary(app, client):
+    add_primary_venue(app)
+    response = client.post('/venues/create', data=NEW_VENUE)
+    assert STICKY_COOKIE not in set_cookies(response)
+
+    response = client.get('/venues')
+    assert b'Primary Hall' in response.data
+    assert b'The Dueling Pianos Bar' in response.data
+
+
+def test_page_cache_is_cleared_again_once_replicas_caught_up(app, database, monkeypatch):
+    jobs = app.extensions['job_queue']
+    backend = MemoryBackend()
+    monkeypatch.setattr(jobs, 'backend', backend)
+    monkeypatch.setattr(jobs, 'eager', False)
+    monkeypatch.setattr(jobs, 'workers', 0)
+    monkeypatch.setattr(replica_router, 'binds', ['replica_0'])
+
+    with app.app_context():
+        make_venue()
+        db.session.commit()
+
+    [(run_at, _, job)] = backend.heap
+    assert job['name'] == 'clear_page_cache'
+    assert run_at - time.monotonic() > replica_router.sticky_seconds - 1
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import Show
+from tests.factories import make_artist, make_venue
+
+
+def book_shows(app, count):
+    #count shows at one venue, spread over ten artists and both sides of now
+    with app.app_context():
+        venue = make_venue()
+        artists = [make_artist(name=f'Artist {index}') for index in range(10)]
+        now = datetime.now()
+        db.session.add_all([
+            Show(artist_id=artists[index % 10].id, venue_id=venue.id, start_time=now + timedelta(days=index - count // 2, hours=1))
+            for index in range(count)
+        ])
+        db.session.commit()
+        return venue.id, artists[0].id
+
+
+def statement_count(client, statements, path):
+    statements.clear()
+    response = client.get(path)
+    assert response.status_code == 200
+    return len(statements)
+
+
+def test_venue_page_statements_do_not_grow_with_shows(app, client, statements):
+    few_venue_id, few_artist_id = book_shows(app, 5)
+    many_venue_id, many_artist_id = book_shows(app, 500)
+
+    assert statement_count(client, statements, f'/venues/{many_venue_id}') == statement_count(client, statements, f'/venues/{few_venue_id}')
+    assert statement_count(client, statements, f'/artists/{many_artist_id}') == statement_count(client, statements, f'/artists/{few_artist_id}')
+
+
+def test_shows_listing_statements_do_not_grow_with_shows(app, client, statements):
+    book_shows(app, 5)
+    few = statement_count(client, statements, '/shows')
+    book_shows(app, 500)
+    assert statement_count(client, statements, '/shows') == few
+
+
+def test_partition_boundary_at_now():
+    from models import partition_shows
+
+    now = datetime(2026, 6, 1, 20, 0)
+    shows = [{'start_time': now - timedelta(microseconds=1)}, {'start_time': now}, {'start_time': now + timedelta(microseconds=1)}]
+    upcoming, past = partition_shows(shows, now)
+
+    #a show starting exactly now has started
+    assert past == shows[:2]
+    assert upcoming == shows[2:]
+
+
+def test_venue_page_counts_each_show_once(app, context):
+    from models import venue_details
+
+    venue_id, _ = book_shows(app, 6)
+    data = venue_details(venue_id)
+
+    assert data['past_shows_count'] == 3
+    assert data['upcoming_shows_count'] == 3
+    assert [show['start_time'] for show in data['past_shows'] + data['upcoming_shows']] == sorted(
+        show['start_time'] for show in data['past_shows'] + data['upcoming_shows']
+    )
+    assert all(show['start_time'] > datetime.now() for show in data['upcoming_shows'])
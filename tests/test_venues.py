@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import refresh_show_counts
+from tests.factories import make_artist, make_show, make_venue
+
+
+def add_venues(app, count, offset=0):
+    with app.app_context():
+        artist = make_artist()
+        for index in range(offset, offset + count):
+            venue = make_venue(name=f'Venue {index}', city=f'City {index % 7}')
+            make_show(artist, venue, datetime.now() + timedelta(days=index + 1))
+            make_show(artist, venue, datetime.now() - timedelta(days=index + 1))
+        #the show views keep the counters up to date, the factories don't
+        refresh_show_counts()
+        db.session.commit()
+
+
+def test_venues_listing_query_count_is_constant(app, client, statements):
+    add_venues(app, 5)
+    statements.clear()
+    assert client.get('/venues').status_code == 200
+    few = len(statements)
+
+    add_venues(app, 35, offset=5)
+    statements.clear()
+    response = client.get('/venues')
+    assert response.status_code == 200
+    assert b'Venue 39' in response.data
+    assert len(statements) == few
+
+
+def test_venues_listing_counts_upcoming_shows(app, database):
+    add_venues(app, 1)
+    with app.app_context():
+        from models import venue_areas
+        areas, _ = venue_areas()
+
+    assert areas == [{'city': 'City 0', 'state': 'CA', 'venues': [{'id': 1, 'name': 'Venue 0', 'num_upcoming_shows': 1}]}]
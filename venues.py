@@ -0,0 +1,178 @@
+import sys
+
+from flask import Blueprint, render_template, request, flash, redirect, url_for, abort
+
+from extensions import db, page_cache, job_queue
+from models import Venue, venue_areas, venue_details, venues_with_upcoming_counts, search_results, genre_facets
+
+#----------------------------------------------------------------------------#
+# Venues.
+#----------------------------------------------------------------------------#
+
+bp = Blueprint('venues', __name__)
+
+
+@bp.route('/venues')
+@page_cache.cached
+def venues():
+    genre = request.args.get('genre')
+    data, next_cursor = venue_areas(request.args.get('after'), genre)
+
+    return render_template('pages/venues.html', areas=data, next_cursor=next_cursor, genre=genre, genres=genre_facets('venues'))
+
+
+@bp.route('/venues/search', methods=['POST'])
+def search_venues():
+    search_input = request.form.get('search_term', '')
+    search_output = search_results(venues_with_upcoming_counts(), Venue, search_input)
+
+    return render_template('pages/search_venues.html', results=search_output, search_term=search_input)
+
+
+@bp.route('/venues/<int:venue_id>')
+@page_cache.cached
+def show_venue(venue_id):
+    data = venue_details(venue_id)
+    if data is None:
+        abort(404)
+
+    return render_template('pages/show_venue.html', venue=data)
+
+#  Create Venue
+#  ----------------------------------------------------------------
+
+
+@bp.route('/venues/create', methods=['GET'])
+def create_venue_form():
+    from forms import VenueForm
+    form = VenueForm()
+    return render_template('forms/new_venue.html', form=form)
+
+
+@bp.route('/venues/create', methods=['POST'])
+def create_venue_submission():
+    #Insert venue form data into the db table
+    error = False
+    try:
+        data = request.form
+        venue = Venue(
+            name=data['name'],
+            city=data['city'],
+            state=data['state'],
+            address=data['address'],
+            phone=data['phone'],
+            genres=data.getlist('genres'),
+            facebook_link=data['facebook_link'],
+            image_link=data['image_link'],
+            website_link=data['website_link'],
+            seeking_description=data['seeking_description']
+        )
+
+        db.session.add(venue)
+        db.session.commit()
+
+    except:
+        error = True
+        db.session.rollback()
+        print(sys.exc_info())
+
+    finally:
+        db.session.close()
+
+    if error == True:
+        flash(f"An error occurred. Venue {data['name']} could not be listed.")
+    else:
+        if data['image_link']:
+            job_queue.enqueue('prefetch_image', link=data['image_link'])
+        flash('Venue ' + request.form['name'] + ' was successfully listed!')
+    return render_template('pages/home.html')
+
+
+@bp.route('/venues/<venue_id>/delete', methods=['DELETE'])
+def delete_venue(venue_id):
+
+    error = False
+
+    try:
+        venue = Venue.query.get(venue_id)
+        db.session.delete(venue)
+        db.session.commit()
+    except:
+        db.session.rollback()
+        print(sys.exc_info())
+        error = True
+    finally:
+        db.session.close()
+
+    if error == True:
+        flash(f'An error occured. Venue {venue.name} delete unsuccessful')
+    else:
+        flash(f'Venue {venue.name} deleted successfully')
+    return render_template('pages/home.html', name=venue.name)
+
+#  Update
+#  ----------------------------------------------------------------
+
+
+@bp.route('/venues/<int:venue_id>/edit', methods=['GET'])
+def edit_venue(venue_id):
+    from forms import VenueForm
+    form = VenueForm()
+    venue = Venue.query.get(venue_id)
+
+    form.name.data = venue.name
+    form.city.data = venue.city
+    form.state.data = venue.state
+    form.address.data = venue.address
+    form.phone.data = venue.phone
+    form.genres.data = venue.genres
+    form.facebook_link.data = venue.facebook_link
+    form.image_link.data = venue.image_link
+    form.website_link.data = venue.website_link
+    form.seeking_talent.data = venue.seeking_talent
+    form.seeking_description.data = venue.seeking_description
+    # TODO: populate form with values from venue with ID <venue_id>
+    return render_template('forms/edit_venue.html', form=form, venue=venue)
+
+
+@bp.route('/venues/<int:venue_id>/edit', methods=['POST'])
+def edit_venue_submission(venue_id):
+    #Edit location data in the db
+
+    error = False
+    venue = Venue.query.get(venue_id)
+
+    try:
+
+        venue.name = request.form['name']
+        venue.city = request.form['city']
+        venue.state = request.form['state']
+        venue.address = request.form['address']
+        venue.phone = request.form['phone']
+        venue.genres = request.form.getlist('genres')
+        venue.facebook_link = request.form['facebook_link']
+        venue.image_link = request.form['image_link']
+        venue.website_link = request.form['website_link']
+        venue.seeking_talent = True
+        venue.seeking_description = request.form['seeking_description']
+
+        db.session.commit()
+
+    except:
+        db.session.rollback()
+        error = True
+        print(sys.exc_info())
+
+    finally:
+        db.session.close()
+
+    if error:
+        flash('An error occurred. Venue could not be updated.')
+    else:
+        #the upcoming shows feed carries a copy of the venue's name and city
+        job_queue.enqueue('refresh_upcoming_shows', venue_ids=[venue_id])
+        if request.form['image_link']:
+            job_queue.enqueue('prefetch_image', link=request.form['image_link'])
+        flash('Venue was successfully updated!')
+
+    return redirect(url_for('venues.show_venue', venue_id=venue_id))
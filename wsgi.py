@@ -0,0 +1,10 @@
+import gc
+
+from app import create_app
+
+# WSGI entry point: gunicorn --preload wsgi:app
+app = create_app(with_cli=False)
+
+# Keep the objects built at import time out of the collector's reach, so
+# preloaded workers don't copy those pages just by running gc after fork
+gc.freeze()